@@ -21,6 +21,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger("attachment_processor")
 
+# Padrões comuns para números de contrato
+_CONTRACT_NUMBER_PATTERNS = [
+    r'contrato\s+n[º°]?\s*[:.]?\s*(\d{4,10}[-/]?[\dA-Z]{0,5})',  # Contrato Nº: 12345
+    r'contrato\s+(\d{4,10}[-/]?[\dA-Z]{0,5})',                   # Contrato 12345
+    r'n[º°]?\s*[:.]?\s*(\d{4,10}[-/]?[\dA-Z]{0,5})',             # Nº: 12345
+    r'processo\s+n[º°]?\s*[:.]?\s*(\d{4,10}[-/]?[\dA-Z]{0,5})'   # Processo Nº: 12345
+]
+
+# Padrões comuns para nomes de escolas
+_SCHOOL_NAME_PATTERNS = [
+    r'escola\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',                     # Escola Nome da Escola
+    r'colégio\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',                    # Colégio Nome do Colégio
+    r'centro\s+educacional\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',       # Centro Educacional Nome
+    r'e\.e\.\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',                     # E.E. Nome da Escola
+    r'e\.m\.\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})'                      # E.M. Nome da Escola
+]
+
+# Padrões comuns para datas
+_DATE_PATTERNS = [
+    r'(\d{2}/\d{2}/\d{4})',                                      # DD/MM/AAAA
+    r'(\d{2}\.\d{2}\.\d{4})',                                     # DD.MM.AAAA
+    r'(\d{2}-\d{2}-\d{4})',                                       # DD-MM-AAAA
+    r'(\d{1,2}\s+de\s+[a-zç]+\s+de\s+\d{4})'                     # DD de Mês de AAAA
+]
+
+def _compile_alternatives(patterns: List[str]) -> re.Pattern:
+    """
+    Compila as alternativas de um tipo de informação em uma única expressão
+    (uma varredura do texto). Cada alternativa fica em um grupo externo; o
+    valor é o grupo capturado logo dentro dele (match.lastindex + 1).
+    
+    Args:
+        patterns: Padrões com exatamente um grupo de captura cada
+        
+    Returns:
+        re.Pattern: Padrão compilado, sem distinção de maiúsculas
+    """
+    return re.compile('|'.join(f'({pattern})' for pattern in patterns), re.IGNORECASE)
+
+_CONTRACT_NUMBER_RE = _compile_alternatives(_CONTRACT_NUMBER_PATTERNS)
+# Nomes de escolas: um padrão por vez, pois a classe de letras e espaços de uma
+# alternativa consome a palavra-chave da seguinte ("escola Alfa e no colégio Beta")
+# e uma alternação única perderia a correspondência sobreposta
+_SCHOOL_NAME_RES = [re.compile(pattern, re.IGNORECASE) for pattern in _SCHOOL_NAME_PATTERNS]
+_DATE_RE = _compile_alternatives(_DATE_PATTERNS)
+_TRAILING_PUNCT_RE = re.compile(r'[.,;:]$')
+
 class AttachmentProcessorInterface:
     """Interface para processadores de anexos."""
     
@@ -132,22 +179,9 @@ class PDFProcessor(AttachmentProcessorInterface):
         Returns:
             List[str]: Lista de possíveis números de contrato
         """
-        # Padrões comuns para números de contrato
-        patterns = [
-            r'contrato\s+n[º°]?\s*[:.]?\s*(\d{4,10}[-/]?[\dA-Z]{0,5})',  # Contrato Nº: 12345
-            r'contrato\s+(\d{4,10}[-/]?[\dA-Z]{0,5})',                   # Contrato 12345
-            r'n[º°]?\s*[:.]?\s*(\d{4,10}[-/]?[\dA-Z]{0,5})',             # Nº: 12345
-            r'processo\s+n[º°]?\s*[:.]?\s*(\d{4,10}[-/]?[\dA-Z]{0,5})'   # Processo Nº: 12345
-        ]
+        contract_numbers = [match.group(match.lastindex + 1) for match in _CONTRACT_NUMBER_RE.finditer(text)]
         
-        contract_numbers = []
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                contract_numbers.append(match.group(1))
-        
-        return list(set(contract_numbers))  # Remove duplicatas
+        return list(dict.fromkeys(contract_numbers))  # Remove duplicatas
     
     def _extract_school_names(self, text: str) -> List[str]:
         """
@@ -159,27 +193,17 @@ class PDFProcessor(AttachmentProcessorInterface):
         Returns:
             List[str]: Lista de possíveis nomes de escolas
         """
-        # Padrões comuns para nomes de escolas
-        patterns = [
-            r'escola\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',                     # Escola Nome da Escola
-            r'colégio\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',                    # Colégio Nome do Colégio
-            r'centro\s+educacional\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',       # Centro Educacional Nome
-            r'e\.e\.\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',                     # E.E. Nome da Escola
-            r'e\.m\.\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})'                      # E.M. Nome da Escola
-        ]
-        
         school_names = []
         
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in _SCHOOL_NAME_RES:
+            for match in pattern.finditer(text):
                 # Limpa o nome da escola (remove espaços extras, pontuação no final, etc.)
                 school_name = match.group(1).strip()
-                school_name = re.sub(r'[.,;:]$', '', school_name)
+                school_name = _TRAILING_PUNCT_RE.sub('', school_name)
                 if len(school_name) > 3:  # Ignora nomes muito curtos
                     school_names.append(school_name)
         
-        return list(set(school_names))  # Remove duplicatas
+        return list(dict.fromkeys(school_names))  # Remove duplicatas
     
     def _extract_dates(self, text: str) -> List[str]:
         """
@@ -191,22 +215,9 @@ class PDFProcessor(AttachmentProcessorInterface):
         Returns:
             List[str]: Lista de possíveis datas
         """
-        # Padrões comuns para datas
-        patterns = [
-            r'(\d{2}/\d{2}/\d{4})',                                      # DD/MM/AAAA
-            r'(\d{2}\.\d{2}\.\d{4})',                                     # DD.MM.AAAA
-            r'(\d{2}-\d{2}-\d{4})',                                       # DD-MM-AAAA
-            r'(\d{1,2}\s+de\s+[a-zç]+\s+de\s+\d{4})'                     # DD de Mês de AAAA
-        ]
-        
-        dates = []
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                dates.append(match.group(1))
+        dates = [match.group(match.lastindex + 1) for match in _DATE_RE.finditer(text)]
         
-        return list(set(dates))  # Remove duplicatas
+        return list(dict.fromkeys(dates))  # Remove duplicatas
 
 class DocxProcessor(AttachmentProcessorInterface):
     """Processador para arquivos DOCX."""
@@ -1,11 +1,15 @@
 import os
+import sys
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 import json
+import re
+import functools
+from collections import Counter
 from pathlib import Path
 import numpy as np
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from joblib import Parallel, delayed
 
 # Configuração de logging
 logging.basicConfig(
@@ -14,6 +18,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger("contract_matcher")
 
+@functools.lru_cache(maxsize=1024)
+def _build_matching_text(subject: str, body: str, entities: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> str:
+    """
+    Monta o texto de correspondência de um e-mail (memoizado).
+    
+    Args:
+        subject: Assunto do e-mail
+        body: Corpo do e-mail
+        entities: Entidades extraídas como tuplas (tipo, valores)
+        
+    Returns:
+        str: Texto extraído
+    """
+    texts = []
+    
+    # Adiciona assunto
+    if subject:
+        texts.append(subject)
+    
+    # Adiciona corpo
+    if body:
+        texts.append(body)
+    
+    # Adiciona entidades extraídas
+    for entity_type, values in entities:
+        if values:
+            texts.append(f"{entity_type}: {', '.join(values)}")
+    
+    # Combina todos os textos
+    return "\n\n".join(texts)
+
 class ContractMatcher:
     """
     Classe responsável por associar e-mails a contratos existentes.
@@ -29,6 +64,11 @@ class ContractMatcher:
         self.contracts_db_path = contracts_db_path
         self.contracts = []
         self.vectorizer = CountVectorizer(ngram_range=(1, 2), stop_words='english')
+        self._contract_keyword_set = set()
+        self._contract_texts = []
+        self._contract_matrix = None
+        self._contract_matrix_T = None
+        self._contract_norms = None
         
         # Carrega contratos se o caminho for fornecido
         if contracts_db_path:
@@ -44,11 +84,79 @@ class ContractMatcher:
             with open(self.contracts_db_path, 'r') as f:
                 self.contracts = json.load(f)
             
+            # Interna campos repetidos para que valores iguais compartilhem o mesmo objeto
+            for contract in self.contracts:
+                for field in ('type', 'status', 'school_name', 'contract_number'):
+                    value = contract.get(field)
+                    if isinstance(value, str):
+                        contract[field] = sys.intern(value)
+            
             logger.info(f"Carregados {len(self.contracts)} contratos do banco de dados")
+            
+            # Monta vocabulário de palavras-chave raras dos contratos
+            self._contract_keyword_set = self._build_contract_keyword_set()
+            
+            # Vetoriza os contratos uma única vez
+            self._build_contract_matrix()
         
         except Exception as e:
             logger.error(f"Erro ao carregar contratos: {str(e)}")
             self.contracts = []
+            self._contract_keyword_set = set()
+            self._contract_matrix = None
+            self._contract_matrix_T = None
+            self._contract_norms = None
+    
+    def _build_contract_matrix(self) -> None:
+        """Ajusta o vetorizador aos contratos e pré-calcula a matriz esparsa e as normas."""
+        try:
+            self._contract_texts = [self._extract_contract_text(contract) for contract in self.contracts]
+            self._contract_matrix = self.vectorizer.fit_transform(self._contract_texts).tocsr()
+            # Transposta em CSC evita conversão de formato a cada consulta
+            self._contract_matrix_T = self._contract_matrix.T.tocsc()
+            self._contract_norms = np.sqrt(
+                np.asarray(self._contract_matrix.multiply(self._contract_matrix).sum(axis=1)).ravel()
+            )
+        
+        except Exception as e:
+            logger.error(f"Erro ao vetorizar contratos: {str(e)}")
+            self._contract_texts = []
+            self._contract_matrix = None
+            self._contract_matrix_T = None
+            self._contract_norms = None
+    
+    def _build_contract_keyword_set(self) -> set:
+        """
+        Constrói o conjunto de palavras-chave raras dos contratos.
+        
+        Considera descrições e nomes de escolas, descartando tokens presentes
+        em mais da metade dos contratos (pouco discriminativos).
+        
+        Returns:
+            set: Conjunto de palavras-chave
+        """
+        document_frequency = {}
+        
+        for contract in self.contracts:
+            text = f"{contract.get('school_name', '')} {contract.get('description', '')}"
+            for token in set(self._tokenize_keywords(text)):
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        
+        max_frequency = max(1, len(self.contracts) // 2)
+        
+        return {token for token, count in document_frequency.items() if count <= max_frequency}
+    
+    def _tokenize_keywords(self, text: str) -> List[str]:
+        """
+        Extrai tokens normalizados para o filtro de palavras-chave.
+        
+        Args:
+            text: Texto de entrada
+            
+        Returns:
+            List[str]: Lista de tokens em minúsculas com 3 ou mais caracteres
+        """
+        return re.findall(r'\w{3,}', text.lower())
     
     def match_contract(self, email: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -57,6 +165,65 @@ class ContractMatcher:
         Args:
             email: E-mail a ser associado
             
+        Returns:
+            Dict[str, Any]: E-mail com informações de contratos associados
+        """
+        return self._match_contract(email)
+    
+    def match_contracts_batch(self, emails: List[Dict[str, Any]], n_jobs: int = -1) -> List[Dict[str, Any]]:
+        """
+        Associa um lote de e-mails a contratos existentes.
+        
+        O produto esparso entre e-mails e contratos é calculado uma única vez para
+        todo o lote; a montagem dos resultados é distribuída entre threads.
+        
+        Args:
+            emails: Lista de e-mails a serem associados
+            n_jobs: Número de threads (-1 usa todos os núcleos)
+            
+        Returns:
+            List[Dict[str, Any]]: E-mails com informações de contratos associados
+        """
+        if not emails:
+            return []
+        
+        product = None
+        
+        if self.contracts:
+            # Vetoriza contratos se ainda não tiverem sido vetorizados
+            if self._contract_matrix is None:
+                self._build_contract_matrix()
+            
+            if self._contract_matrix is not None:
+                try:
+                    texts = [self._extract_text_for_matching(email) for email in emails]
+                    product = (self.vectorizer.transform(texts) @ self._contract_matrix_T).tocsr()
+                    product.sort_indices()
+                
+                except Exception as e:
+                    logger.error(f"Erro ao calcular similaridade do lote: {str(e)}")
+                    product = None
+        
+        def _assemble(i: int) -> Dict[str, Any]:
+            product_row = None
+            if product is not None:
+                start, end = product.indptr[i], product.indptr[i + 1]
+                product_row = (product.indices[start:end], product.data[start:end])
+            return self._match_contract(emails[i], product_row)
+        
+        return Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(_assemble)(i) for i in range(len(emails))
+        )
+    
+    def _match_contract(self, email: Dict[str, Any],
+                        product_row: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, Any]:
+        """
+        Associa um e-mail a contratos, reaproveitando o produto esparso se fornecido.
+        
+        Args:
+            email: E-mail a ser associado
+            product_row: Índices e valores não nulos do produto e-mail × contratos (opcional)
+            
         Returns:
             Dict[str, Any]: E-mail com informações de contratos associados
         """
@@ -78,7 +245,7 @@ class ContractMatcher:
             if contract_numbers:
                 exact_matches = self._match_by_contract_number(contract_numbers)
                 if exact_matches:
-                    matched_email['matched_contracts'] = exact_matches
+                    matched_email['matched_contracts'] = self._materialize_matches(exact_matches)
                     matched_email['has_contract_match'] = True
                     matched_email['match_method'] = 'contract_number'
                     return matched_email
@@ -88,15 +255,23 @@ class ContractMatcher:
             if school_names:
                 school_matches = self._match_by_school_name(school_names)
                 if school_matches:
-                    matched_email['matched_contracts'] = school_matches
+                    matched_email['matched_contracts'] = self._materialize_matches(school_matches)
                     matched_email['has_contract_match'] = True
                     matched_email['match_method'] = 'school_name'
                     return matched_email
             
+            # Descarta e-mails sem nenhuma palavra-chave de contrato antes da vetorização
+            if self._contract_keyword_set:
+                email_tokens = set(self._tokenize_keywords(self._extract_text_for_matching(email)))
+                if email_tokens.isdisjoint(self._contract_keyword_set):
+                    matched_email['matched_contracts'] = []
+                    matched_email['has_contract_match'] = False
+                    return matched_email
+            
             # Tenta associar por similaridade de texto
-            text_matches = self._match_by_text_similarity(email)
+            text_matches = self._match_by_text_similarity(email, product_row)
             if text_matches:
-                matched_email['matched_contracts'] = text_matches
+                matched_email['matched_contracts'] = self._materialize_matches(text_matches)
                 matched_email['has_contract_match'] = True
                 matched_email['match_method'] = 'text_similarity'
                 return matched_email
@@ -115,7 +290,19 @@ class ContractMatcher:
             email['match_error'] = str(e)
             return email
     
-    def _match_by_contract_number(self, contract_numbers: List[str]) -> List[Dict[str, Any]]:
+    def _materialize_matches(self, matches: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+        """
+        Converte pares (índice, score) nos dicionários de contrato correspondentes.
+        
+        Args:
+            matches: Lista de tuplas (índice do contrato, score de correspondência)
+            
+        Returns:
+            List[Dict[str, Any]]: Lista de contratos com o campo match_score
+        """
+        return [{**self.contracts[i], 'match_score': score} for i, score in matches]
+    
+    def _match_by_contract_number(self, contract_numbers: List[str]) -> List[Tuple[int, float]]:
         """
         Associa por número de contrato.
         
@@ -123,24 +310,18 @@ class ContractMatcher:
             contract_numbers: Lista de números de contrato
             
         Returns:
-            List[Dict[str, Any]]: Lista de contratos correspondentes
+            List[Tuple[int, float]]: Lista de (índice do contrato, score) correspondentes
         """
         matches = []
         
-        for contract in self.contracts:
+        for i, contract in enumerate(self.contracts):
             contract_number = contract.get('contract_number', '')
             if contract_number and any(num == contract_number for num in contract_numbers):
-                # Cria cópia do contrato e adiciona score de correspondência
-                match = contract.copy()
-                match['match_score'] = 1.0  # Correspondência exata
-                matches.append(match)
-        
-        # Ordena por score (maior primeiro)
-        matches.sort(key=lambda x: x.get('match_score', 0.0), reverse=True)
+                matches.append((i, 1.0))  # Correspondência exata
         
         return matches
     
-    def _match_by_school_name(self, school_names: List[str]) -> List[Dict[str, Any]]:
+    def _match_by_school_name(self, school_names: List[str]) -> List[Tuple[int, float]]:
         """
         Associa por nome de escola.
         
@@ -148,11 +329,11 @@ class ContractMatcher:
             school_names: Lista de nomes de escolas
             
         Returns:
-            List[Dict[str, Any]]: Lista de contratos correspondentes
+            List[Tuple[int, float]]: Lista de (índice do contrato, score) correspondentes
         """
         matches = []
         
-        for contract in self.contracts:
+        for i, contract in enumerate(self.contracts):
             school_name = contract.get('school_name', '')
             if not school_name:
                 continue
@@ -163,26 +344,25 @@ class ContractMatcher:
                 
                 # Se a similaridade for alta o suficiente
                 if similarity >= 0.8:
-                    # Cria cópia do contrato e adiciona score de correspondência
-                    match = contract.copy()
-                    match['match_score'] = similarity
-                    matches.append(match)
+                    matches.append((i, similarity))
                     break  # Passa para o próximo contrato
         
         # Ordena por score (maior primeiro)
-        matches.sort(key=lambda x: x.get('match_score', 0.0), reverse=True)
+        matches.sort(key=lambda x: x[1], reverse=True)
         
         return matches
     
-    def _match_by_text_similarity(self, email: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _match_by_text_similarity(self, email: Dict[str, Any],
+                                  product_row: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> List[Tuple[int, float]]:
         """
         Associa por similaridade de texto.
         
         Args:
             email: E-mail a ser associado
+            product_row: Índices e valores não nulos do produto já calculado (opcional)
             
         Returns:
-            List[Dict[str, Any]]: Lista de contratos correspondentes
+            List[Tuple[int, float]]: Lista de (índice do contrato, score) correspondentes
         """
         # Extrai texto do e-mail
         email_text = self._extract_text_for_matching(email)
@@ -191,38 +371,45 @@ class ContractMatcher:
         if len(email_text.split()) < 10:
             return []
         
-        matches = []
+        # Vetoriza contratos se ainda não tiverem sido vetorizados
+        if self._contract_matrix is None:
+            self._build_contract_matrix()
+            if self._contract_matrix is None:
+                return []
         
-        # Prepara textos para vetorização
-        texts = [email_text]
-        for contract in self.contracts:
-            contract_text = self._extract_contract_text(contract)
-            texts.append(contract_text)
-        
-        # Vetoriza textos
         try:
-            X = self.vectorizer.fit_transform(texts)
+            # Norma do e-mail considera todos os seus termos, inclusive os ausentes nos contratos
+            term_counts = Counter(self.vectorizer.build_analyzer()(email_text))
+            email_norm = np.sqrt(sum(count * count for count in term_counts.values()))
+            if email_norm == 0:
+                return []
+            
+            if product_row is None:
+                # Produto esparso: apenas contratos com termos em comum geram entradas
+                email_vector = self.vectorizer.transform([email_text])
+                product = (email_vector @ self._contract_matrix_T).tocsr()
+                product.sort_indices()
+                product_row = (product.indices, product.data)
             
-            # Calcula similaridade entre o e-mail e cada contrato
-            email_vector = X[0]
-            contract_vectors = X[1:]
+            # Calcula similaridade de cosseno apenas nas posições não nulas
+            indices, dots = product_row
+            similarities = dots / (email_norm * self._contract_norms[indices])
             
-            # Calcula similaridade de cosseno
-            similarities = cosine_similarity(email_vector, contract_vectors).flatten()
+            # Seleciona contratos com similaridade alta
+            mask = similarities >= 0.3  # Limiar de similaridade
+            candidates = indices[mask]
+            scores = similarities[mask]
             
-            # Adiciona contratos com similaridade alta
-            for i, similarity in enumerate(similarities):
-                if similarity >= 0.3:  # Limiar de similaridade
-                    # Cria cópia do contrato e adiciona score de correspondência
-                    match = self.contracts[i].copy()
-                    match['match_score'] = float(similarity)
-                    matches.append(match)
+            # Seleciona os 5 melhores sem ordenar todos os candidatos
+            if len(candidates) > 5:
+                top = np.sort(np.argpartition(-scores, 5)[:5])
+                candidates = candidates[top]
+                scores = scores[top]
             
             # Ordena por score (maior primeiro)
-            matches.sort(key=lambda x: x.get('match_score', 0.0), reverse=True)
+            order = np.argsort(-scores, kind='stable')
             
-            # Limita o número de correspondências
-            return matches[:5]
+            return [(int(candidates[j]), float(scores[j])) for j in order]
         
         except Exception as e:
             logger.error(f"Erro ao calcular similaridade de texto: {str(e)}")
@@ -276,27 +463,12 @@ class ContractMatcher:
         Returns:
             str: Texto extraído
         """
-        texts = []
-        
-        # Adiciona assunto
-        subject = email.get('subject', '')
-        if subject:
-            texts.append(subject)
+        entities = tuple(
+            (entity_type, tuple(values) if values else ())
+            for entity_type, values in email.get('entities', {}).items()
+        )
         
-        # Adiciona corpo
-        body = email.get('body', '')
-        if body:
-            texts.append(body)
-        
-        # Adiciona entidades extraídas
-        entities = email.get('entities', {})
-        for entity_type, values in entities.items():
-            if values:
-                entity_text = f"{entity_type}: {', '.join(values)}"
-                texts.append(entity_text)
-        
-        # Combina todos os textos
-        return "\n\n".join(texts)
+        return _build_matching_text(email.get('subject', ''), email.get('body', ''), entities)
     
     def _extract_contract_text(self, contract: Dict[str, Any]) -> str:
         """
@@ -1,13 +1,28 @@
 import os
+import io
+import functools
+import html
 import logging
 import json
 from typing import Dict, List, Any, Optional, Tuple
 import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import gradio as gr
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
+from matplotlib.figure import Figure
 from pathlib import Path
 
+# Usa orjson para os históricos quando disponível
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -15,11 +30,90 @@ logging.basicConfig(
 )
 logger = logging.getLogger("dashboard")
 
+@functools.lru_cache(maxsize=8)
+def _load_dashboard_config(config_path: Optional[str], mtime_ns: int) -> Dict[str, Any]:
+    """
+    Carrega configuração do dashboard (memoizada por caminho e data de modificação).
+    
+    Args:
+        config_path: Caminho para o arquivo de configuração
+        mtime_ns: Data de modificação do arquivo, usada apenas como chave do cache
+        
+    Returns:
+        Dict[str, Any]: Configuração carregada
+    """
+    # Configuração padrão
+    default_config = {
+        'dashboard': {
+            'title': 'Sistema de Gerenciamento de Contratos Escolares',
+            'theme': 'default',
+            'refresh_interval': 60,  # segundos
+            'watch_interval': 1,  # segundos entre verificações dos históricos
+            'max_items_per_page': 20,
+            'charts': {
+                'show_category_distribution': True,
+                'show_priority_distribution': True,
+                'show_department_distribution': True,
+                'show_routing_timeline': True
+            }
+        },
+        'router': {
+            'routing_history_path': 'routing_history.json'
+        },
+        'notification': {
+            'history_path': 'notification_history.json'
+        }
+    }
+    
+    # Se não houver caminho de configuração, retorna configuração padrão
+    if not config_path:
+        logger.warning("Nenhum arquivo de configuração fornecido, usando configuração padrão")
+        return default_config
+    
+    try:
+        # Carrega configuração do arquivo
+        with open(config_path, 'r') as file:
+            config = json.load(file)
+        
+        logger.info(f"Configuração carregada de {config_path}")
+        
+        # Mescla com configuração padrão para garantir que todos os campos existam
+        for section, values in default_config.items():
+            if section not in config:
+                config[section] = values
+            else:
+                if isinstance(values, dict):
+                    for key, value in values.items():
+                        if key not in config[section]:
+                            config[section][key] = value
+        
+        return config
+    
+    except Exception as e:
+        logger.error(f"Erro ao carregar configuração de {config_path}: {str(e)}")
+        logger.warning("Usando configuração padrão")
+        return default_config
+
 class Dashboard:
     """
     Classe responsável pela interface de usuário do sistema de gerenciamento de contratos.
     """
     
+    # Colunas dos históricos efetivamente usadas pelos gráficos e tabelas
+    _ROUTING_COLUMNS = ['subject', 'from', 'category', 'priority', 'department', 'routing_date']
+    _NOTIFICATION_COLUMNS = ['title', 'level', 'department', 'date']
+    
+    # Ordem de exibição das prioridades
+    _PRIORITY_ORDER = ['baixa', 'normal', 'alta', 'urgente']
+    
+    # Margens fixas de cada gráfico (substituem o tight_layout a cada atualização)
+    _FIGURE_MARGINS = {
+        'category': {'left': 0.1, 'right': 0.95, 'bottom': 0.28, 'top': 0.92},
+        'priority': {'left': 0.1, 'right': 0.95, 'bottom': 0.18, 'top': 0.92},
+        'department': {'left': 0.05, 'right': 0.95, 'bottom': 0.05, 'top': 0.92},
+        'timeline': {'left': 0.08, 'right': 0.97, 'bottom': 0.15, 'top': 0.92}
+    }
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Inicializa o dashboard.
@@ -37,6 +131,42 @@ class Dashboard:
         self.routing_history_path = self.config.get('router', {}).get('routing_history_path', 'routing_history.json')
         self.notification_history_path = self.config.get('notification', {}).get('history_path', 'notification_history.json')
         
+        # O arquivo de notificações pode acumular até 2x max_history linhas entre compactações
+        self.notification_max_history = self.config.get('notification', {}).get('max_history', 1000)
+        
+        # Cache dos históricos (ver _read_history_file)
+        self._routing_cache = self._new_history_cache()
+        self._notification_cache = self._new_history_cache()
+        
+        # DataFrames construídos a partir do histórico em cache: (histórico, DataFrame)
+        self._routing_df_cache = None
+        self._notification_df_cache = None
+        
+        # Figuras reutilizadas entre atualizações: nome do gráfico -> (figura, eixos)
+        self._figs = {}
+        
+        # Última saída do dashboard, indexada pelo estado dos arquivos de histórico
+        self._update_cache = {'key': None, 'value': None}
+        
+        # Executor para gerar gráficos e tabelas em paralelo
+        self._exec = ThreadPoolExecutor(max_workers=4)
+        
+        # Serializa atualizações simultâneas (botão, carga inicial e consultas periódicas
+        # de cada cliente), que compartilham os caches de histórico e as figuras
+        self._update_lock = threading.Lock()
+        
+        # Versão dos históricos, incrementada pelo observador compartilhado quando os arquivos mudam
+        self._history_version = 0
+        self._watcher_thread = None
+        
+        # Estrutura fixa das tabelas; apenas as linhas mudam a cada atualização
+        self._routing_table_skeleton = self._build_table_skeleton(
+            ['Assunto', 'De', 'Categoria', 'Prioridade', 'Departamento', 'Data']
+        )
+        self._notification_table_skeleton = self._build_table_skeleton(
+            ['Título', 'Nível', 'Departamento', 'Data']
+        )
+        
         # Inicializa interface
         self.interface = None
     
@@ -50,56 +180,100 @@ class Dashboard:
         Returns:
             Dict[str, Any]: Configuração carregada
         """
-        # Configuração padrão
-        default_config = {
-            'dashboard': {
-                'title': 'Sistema de Gerenciamento de Contratos Escolares',
-                'theme': 'default',
-                'refresh_interval': 60,  # segundos
-                'max_items_per_page': 20,
-                'charts': {
-                    'show_category_distribution': True,
-                    'show_priority_distribution': True,
-                    'show_department_distribution': True,
-                    'show_routing_timeline': True
-                }
-            },
-            'router': {
-                'routing_history_path': 'routing_history.json'
-            },
-            'notification': {
-                'history_path': 'notification_history.json'
-            }
-        }
+        try:
+            mtime_ns = os.stat(config_path).st_mtime_ns if config_path else 0
+        except OSError:
+            mtime_ns = 0
         
-        # Se não houver caminho de configuração, retorna configuração padrão
-        if not config_path:
-            logger.warning("Nenhum arquivo de configuração fornecido, usando configuração padrão")
-            return default_config
+        return _load_dashboard_config(config_path, mtime_ns)
+    
+    def _new_history_cache(self) -> Dict[str, Any]:
+        """
+        Cria o cache vazio de um arquivo de histórico.
         
-        try:
-            # Carrega configuração do arquivo
-            with open(config_path, 'r') as file:
-                config = json.load(file)
+        Returns:
+            Dict[str, Any]: Estado do arquivo (stat, formato, deslocamento lido) e registros
+        """
+        return {'key': None, 'ino': None, 'jsonl': False, 'offset': 0, 'history': [], 'base': None, 'dropped': 0}
+    
+    def _parse_jsonl(self, data: bytes) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Converte linhas JSON completas em registros.
+        
+        Args:
+            data: Conteúdo lido do arquivo
+            
+        Returns:
+            Tuple[List[Dict[str, Any]], int]: Registros e número de bytes consumidos
+                (uma última linha incompleta é deixada para a próxima leitura)
+        """
+        complete = data.rfind(b'\n') + 1
+        rows = [_json_loads(line) for line in data[:complete].splitlines() if line.strip()]
+        
+        return rows, complete
+    
+    def _read_history_file(self, path: str, cache: Dict[str, Any],
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Lê um arquivo de histórico, reaproveitando o que já foi carregado.
+        
+        Arquivos JSONL que apenas cresceram são lidos a partir do último
+        deslocamento; nesse caso cache['base'] guarda a lista anterior, da qual
+        o novo histórico é uma extensão após descartar os cache['dropped']
+        primeiros registros. Arquivos JSON (lista) são relidos por inteiro.
+        
+        Args:
+            path: Caminho do arquivo
+            cache: Cache do arquivo, atualizado no lugar
+            limit: Número máximo de registros mantidos (os mais recentes)
+            
+        Returns:
+            List[Dict[str, Any]]: Registros do histórico
+        """
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        
+        # Reutiliza histórico já carregado se o arquivo não mudou
+        if cache['key'] == key:
+            return cache['history']
+        
+        appended = cache['jsonl'] and cache['ino'] == stat.st_ino and stat.st_size >= cache['offset']
+        
+        if appended:
+            # Lê apenas os bytes adicionados desde a última leitura
+            with open(path, 'rb') as f:
+                f.seek(cache['offset'])
+                new_rows, consumed = self._parse_jsonl(f.read())
             
-            logger.info(f"Configuração carregada de {config_path}")
+            if new_rows:
+                history = cache['history'] + new_rows
+                dropped = len(history) - limit if limit and len(history) > limit else 0
+                cache['base'] = cache['history']
+                cache['dropped'] = dropped
+                cache['history'] = history[dropped:]
+            cache['offset'] += consumed
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
             
-            # Mescla com configuração padrão para garantir que todos os campos existam
-            for section, values in default_config.items():
-                if section not in config:
-                    config[section] = values
-                else:
-                    if isinstance(values, dict):
-                        for key, value in values.items():
-                            if key not in config[section]:
-                                config[section][key] = value
+            if data.lstrip()[:1] == b'[':
+                # Formato legado: lista JSON única
+                cache['history'] = _json_loads(data)
+                cache['jsonl'] = False
+                cache['offset'] = len(data)
+            else:
+                cache['history'], cache['offset'] = self._parse_jsonl(data)
+                cache['jsonl'] = True
             
-            return config
+            if limit and len(cache['history']) > limit:
+                cache['history'] = cache['history'][-limit:]
+            cache['base'] = None
+            cache['dropped'] = 0
         
-        except Exception as e:
-            logger.error(f"Erro ao carregar configuração de {config_path}: {str(e)}")
-            logger.warning("Usando configuração padrão")
-            return default_config
+        cache['key'] = key
+        cache['ino'] = stat.st_ino
+        
+        return cache['history']
     
     def _load_routing_history(self) -> List[Dict[str, Any]]:
         """
@@ -113,13 +287,11 @@ class Dashboard:
                 logger.warning(f"Arquivo de histórico de encaminhamentos não encontrado: {self.routing_history_path}")
                 return []
             
-            with open(self.routing_history_path, 'r') as f:
-                history = json.load(f)
-            
-            return history
+            return self._read_history_file(self.routing_history_path, self._routing_cache)
         
         except Exception as e:
             logger.error(f"Erro ao carregar histórico de encaminhamentos: {str(e)}")
+            self._routing_cache = self._new_history_cache()
             return []
     
     def _load_notification_history(self) -> List[Dict[str, Any]]:
@@ -134,15 +306,64 @@ class Dashboard:
                 logger.warning(f"Arquivo de histórico de notificações não encontrado: {self.notification_history_path}")
                 return []
             
-            with open(self.notification_history_path, 'r') as f:
-                history = json.load(f)
-            
-            return history
+            return self._read_history_file(
+                self.notification_history_path, self._notification_cache, self.notification_max_history
+            )
         
         except Exception as e:
             logger.error(f"Erro ao carregar histórico de notificações: {str(e)}")
+            self._notification_cache = self._new_history_cache()
             return []
     
+    def _present_columns(self, history: List[Dict[str, Any]], columns: List[str]) -> List[str]:
+        """
+        Filtra as colunas que aparecem em ao menos um registro do histórico.
+        
+        Args:
+            history: Registros do histórico
+            columns: Colunas desejadas
+            
+        Returns:
+            List[str]: Colunas presentes no histórico
+        """
+        return [column for column in columns if any(column in entry for entry in history)]
+    
+    def _extend_dataframe(self, df_cache: Optional[Tuple[List[Dict[str, Any]], pd.DataFrame]],
+                          history: List[Dict[str, Any]], base: Optional[List[Dict[str, Any]]],
+                          columns: List[str], date_column: str, dropped: int = 0) -> pd.DataFrame:
+        """
+        Constrói o DataFrame de um histórico, anexando apenas registros novos quando possível.
+        
+        Args:
+            df_cache: Último (histórico, DataFrame) construído
+            history: Histórico atual
+            base: Histórico anterior do qual o atual é extensão (ou None)
+            columns: Colunas usadas pelo dashboard
+            date_column: Coluna de data a ser convertida
+            dropped: Registros iniciais de base descartados do histórico atual
+            
+        Returns:
+            pd.DataFrame: DataFrame do histórico
+        """
+        if df_cache and base is not None and df_cache[0] is base and dropped <= len(base):
+            # Converte apenas os registros adicionados desde a última construção
+            previous = df_cache[1].iloc[dropped:]
+            rows = history[len(base) - dropped:]
+            row_columns = [
+                column for column in columns
+                if column in previous.columns or any(column in entry for entry in rows)
+            ]
+            frames = [previous, pd.DataFrame(rows, columns=row_columns)]
+        else:
+            # Materializa apenas as colunas usadas (o histórico pode incluir corpo, anexos etc.)
+            frames = [pd.DataFrame(history, columns=self._present_columns(history, columns))]
+        
+        # Converte datas
+        if date_column in frames[-1].columns:
+            frames[-1][date_column] = pd.to_datetime(frames[-1][date_column])
+        
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    
     def _create_routing_dataframe(self) -> pd.DataFrame:
         """
         Cria DataFrame com histórico de encaminhamentos.
@@ -158,11 +379,24 @@ class Dashboard:
                 'department', 'routing_status', 'routing_date', 'routed_to_email'
             ])
         
-        df = pd.DataFrame(history)
+        # Reutiliza DataFrame se o histórico não foi recarregado
+        if self._routing_df_cache and self._routing_df_cache[0] is history:
+            return self._routing_df_cache[1]
         
-        # Converte datas
-        if 'routing_date' in df.columns:
-            df['routing_date'] = pd.to_datetime(df['routing_date'])
+        df = self._extend_dataframe(
+            self._routing_df_cache, history, self._routing_cache['base'],
+            self._ROUTING_COLUMNS, 'routing_date'
+        )
+        
+        # Converte colunas de baixa cardinalidade para categóricas
+        for column in ('category', 'department'):
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        
+        if 'priority' in df.columns:
+            df['priority'] = df['priority'].astype(self._priority_dtype(df['priority']))
+        
+        self._routing_df_cache = (history, df)
         
         return df
     
@@ -180,14 +414,81 @@ class Dashboard:
                 'id', 'title', 'message', 'level', 'department', 'date'
             ])
         
-        df = pd.DataFrame(history)
+        # Reutiliza DataFrame se o histórico não foi recarregado
+        if self._notification_df_cache and self._notification_df_cache[0] is history:
+            return self._notification_df_cache[1]
         
-        # Converte datas
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
+        df = self._extend_dataframe(
+            self._notification_df_cache, history, self._notification_cache['base'],
+            self._NOTIFICATION_COLUMNS, 'date', self._notification_cache['dropped']
+        )
+        
+        self._notification_df_cache = (history, df)
         
         return df
     
+    def _get_figure(self, name: str, figsize: Tuple[int, int]) -> Tuple[Any, Any]:
+        """
+        Obtém a figura de um gráfico, criando-a apenas na primeira vez.
+        
+        Args:
+            name: Nome do gráfico
+            figsize: Tamanho da figura
+            
+        Returns:
+            Tuple[Any, Any]: Figura e eixos do matplotlib, com os eixos limpos
+        """
+        # Figura criada sem pyplot para poder ser desenhada fora da thread principal
+        if name not in self._figs:
+            fig = Figure(figsize=figsize)
+            fig.subplots_adjust(**self._FIGURE_MARGINS.get(name, {}))
+            self._figs[name] = (fig, fig.subplots())
+        
+        fig, ax = self._figs[name]
+        ax.clear()
+        ax.set_axis_on()
+        
+        return fig, ax
+    
+    def _priority_dtype(self, series: pd.Series) -> pd.CategoricalDtype:
+        """
+        Cria o tipo categórico das prioridades, com as prioridades conhecidas primeiro.
+        
+        Args:
+            series: Coluna de prioridades
+            
+        Returns:
+            pd.CategoricalDtype: Tipo categórico ordenado
+        """
+        extra = sorted(set(series.dropna().unique()) - set(self._PRIORITY_ORDER), key=str)
+        
+        return pd.CategoricalDtype(categories=self._PRIORITY_ORDER + extra, ordered=True)
+    
+    def _count_values(self, series: pd.Series) -> pd.Series:
+        """
+        Conta ocorrências de cada valor, em ordem decrescente de frequência.
+        
+        Args:
+            series: Coluna a ser contada
+            
+        Returns:
+            pd.Series: Contagens indexadas pelo valor
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Contagem direta sobre os códigos das categorias
+            codes = series.cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+            values = series.cat.categories.to_numpy()
+            
+            present = counts > 0
+            values, counts = values[present], counts[present]
+        else:
+            values, counts = np.unique(series.dropna().astype(str).to_numpy(), return_counts=True)
+        
+        order = np.argsort(-counts, kind='stable')
+        
+        return pd.Series(counts[order], index=values[order])
+    
     def _create_category_chart(self, df: pd.DataFrame) -> Any:
         """
         Cria gráfico de distribuição de categorias.
@@ -200,16 +501,16 @@ class Dashboard:
         """
         try:
             if 'category' not in df.columns or df.empty:
-                fig, ax = plt.subplots(figsize=(8, 6))
+                fig, ax = self._get_figure('category', (8, 6))
                 ax.text(0.5, 0.5, "Sem dados disponíveis", ha='center', va='center', fontsize=12)
                 ax.axis('off')
                 return fig
             
             # Conta ocorrências de cada categoria
-            category_counts = df['category'].value_counts()
+            category_counts = self._count_values(df['category'])
             
             # Cria gráfico
-            fig, ax = plt.subplots(figsize=(8, 6))
+            fig, ax = self._get_figure('category', (8, 6))
             category_counts.plot(kind='bar', ax=ax)
             
             ax.set_title('Distribuição de Categorias de E-mails')
@@ -217,13 +518,13 @@ class Dashboard:
             ax.set_ylabel('Quantidade')
             ax.tick_params(axis='x', rotation=45)
             
-            plt.tight_layout()
+            fig.canvas.draw_idle()
             
             return fig
         
         except Exception as e:
             logger.error(f"Erro ao criar gráfico de categorias: {str(e)}")
-            fig, ax = plt.subplots(figsize=(8, 6))
+            fig, ax = self._get_figure('category', (8, 6))
             ax.text(0.5, 0.5, f"Erro ao criar gráfico: {str(e)}", ha='center', va='center', fontsize=12)
             ax.axis('off')
             return fig
@@ -240,36 +541,39 @@ class Dashboard:
         """
         try:
             if 'priority' not in df.columns or df.empty:
-                fig, ax = plt.subplots(figsize=(8, 6))
+                fig, ax = self._get_figure('priority', (8, 6))
                 ax.text(0.5, 0.5, "Sem dados disponíveis", ha='center', va='center', fontsize=12)
                 ax.axis('off')
                 return fig
             
-            # Conta ocorrências de cada prioridade
-            priority_counts = df['priority'].value_counts()
+            priority = df['priority']
+            if not isinstance(priority.dtype, pd.CategoricalDtype):
+                priority = priority.astype(self._priority_dtype(priority))
             
-            # Define ordem das prioridades
-            priority_order = ['baixa', 'normal', 'alta', 'urgente']
-            priority_counts = priority_counts.reindex(priority_order, fill_value=0)
+            # Conta pelos códigos categóricos; as prioridades conhecidas ocupam os primeiros códigos
+            priority_order = self._PRIORITY_ORDER
+            codes = priority.cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(priority.cat.categories))
+            priority_counts = pd.Series(counts[:len(priority_order)], index=priority_order)
             
             # Define cores para cada prioridade
             colors = ['green', 'blue', 'orange', 'red']
             
             # Cria gráfico
-            fig, ax = plt.subplots(figsize=(8, 6))
+            fig, ax = self._get_figure('priority', (8, 6))
             priority_counts.plot(kind='bar', ax=ax, color=colors)
             
             ax.set_title('Distribuição de Prioridades de E-mails')
             ax.set_xlabel('Prioridade')
             ax.set_ylabel('Quantidade')
             
-            plt.tight_layout()
+            fig.canvas.draw_idle()
             
             return fig
         
         except Exception as e:
             logger.error(f"Erro ao criar gráfico de prioridades: {str(e)}")
-            fig, ax = plt.subplots(figsize=(8, 6))
+            fig, ax = self._get_figure('priority', (8, 6))
             ax.text(0.5, 0.5, f"Erro ao criar gráfico: {str(e)}", ha='center', va='center', fontsize=12)
             ax.axis('off')
             return fig
@@ -286,28 +590,28 @@ class Dashboard:
         """
         try:
             if 'department' not in df.columns or df.empty:
-                fig, ax = plt.subplots(figsize=(8, 6))
+                fig, ax = self._get_figure('department', (8, 6))
                 ax.text(0.5, 0.5, "Sem dados disponíveis", ha='center', va='center', fontsize=12)
                 ax.axis('off')
                 return fig
             
             # Conta ocorrências de cada departamento
-            department_counts = df['department'].value_counts()
+            department_counts = self._count_values(df['department'])
             
             # Cria gráfico
-            fig, ax = plt.subplots(figsize=(8, 6))
+            fig, ax = self._get_figure('department', (8, 6))
             department_counts.plot(kind='pie', ax=ax, autopct='%1.1f%%')
             
             ax.set_title('Distribuição de E-mails por Departamento')
             ax.set_ylabel('')
             
-            plt.tight_layout()
+            fig.canvas.draw_idle()
             
             return fig
         
         except Exception as e:
             logger.error(f"Erro ao criar gráfico de departamentos: {str(e)}")
-            fig, ax = plt.subplots(figsize=(8, 6))
+            fig, ax = self._get_figure('department', (8, 6))
             ax.text(0.5, 0.5, f"Erro ao criar gráfico: {str(e)}", ha='center', va='center', fontsize=12)
             ax.axis('off')
             return fig
@@ -324,34 +628,64 @@ class Dashboard:
         """
         try:
             if 'routing_date' not in df.columns or df.empty:
-                fig, ax = plt.subplots(figsize=(10, 6))
+                fig, ax = self._get_figure('timeline', (10, 6))
                 ax.text(0.5, 0.5, "Sem dados disponíveis", ha='center', va='center', fontsize=12)
                 ax.axis('off')
                 return fig
             
-            # Agrupa por data
-            df['date'] = df['routing_date'].dt.date
-            daily_counts = df.groupby('date').size()
+            # Agrupa por dia em uma única passada vetorizada
+            days = df['routing_date'].dropna().to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+            unique_days, counts = np.unique(days, return_counts=True)
+            daily_counts = pd.Series(counts, index=pd.DatetimeIndex(unique_days))
             
             # Cria gráfico
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._get_figure('timeline', (10, 6))
             daily_counts.plot(kind='line', ax=ax, marker='o')
             
             ax.set_title('Encaminhamentos por Dia')
             ax.set_xlabel('Data')
             ax.set_ylabel('Quantidade')
             
-            plt.tight_layout()
+            fig.canvas.draw_idle()
             
             return fig
         
         except Exception as e:
             logger.error(f"Erro ao criar gráfico de linha do tempo: {str(e)}")
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._get_figure('timeline', (10, 6))
             ax.text(0.5, 0.5, f"Erro ao criar gráfico: {str(e)}", ha='center', va='center', fontsize=12)
             ax.axis('off')
             return fig
     
+    def _build_table_skeleton(self, headers: List[str]) -> str:
+        """
+        Gera a estrutura HTML de uma tabela, com o corpo a ser preenchido via format.
+        
+        Args:
+            headers: Títulos das colunas
+            
+        Returns:
+            str: Tabela HTML com marcador {} no lugar do corpo
+        """
+        header = ''.join(f'<th>{html.escape(column)}</th>' for column in headers)
+        
+        return f'<table class="table table-striped"><thead><tr>{header}</tr></thead><tbody>{{}}</tbody></table>'
+    
+    def _render_table_rows(self, df: pd.DataFrame) -> str:
+        """
+        Gera as linhas HTML de uma tabela a partir de um DataFrame.
+        
+        Args:
+            df: DataFrame a ser exibido
+            
+        Returns:
+            str: Linhas HTML
+        """
+        return ''.join(
+            f'<tr>{"".join(f"<td>{html.escape(str(value))}</td>" for value in row)}</tr>'
+            for row in df.itertuples(index=False)
+        )
+    
     def _create_routing_table(self, df: pd.DataFrame, max_rows: int = 20) -> str:
         """
         Cria tabela HTML com histórico de encaminhamentos.
@@ -367,28 +701,22 @@ class Dashboard:
             if df.empty:
                 return "<p>Sem dados disponíveis</p>"
             
-            # Ordena por data (mais recentes primeiro)
+            # Seleciona os mais recentes sem ordenar todo o histórico
             if 'routing_date' in df.columns:
-                df = df.sort_values('routing_date', ascending=False)
-            
-            # Limita número de linhas
-            df = df.head(max_rows)
+                df = df.nlargest(max_rows, 'routing_date')
+            else:
+                df = df.head(max_rows)
             
             # Seleciona colunas relevantes
             columns = ['subject', 'from', 'category', 'priority', 'department', 'routing_date']
-            df_display = df[columns].copy()
+            df_display = df[columns]
             
-            # Formata datas
+            # Formata datas (assign cria novo DataFrame substituindo apenas essa coluna)
             if 'routing_date' in df_display.columns:
-                df_display['routing_date'] = df_display['routing_date'].dt.strftime('%d/%m/%Y %H:%M')
-            
-            # Renomeia colunas
-            df_display.columns = ['Assunto', 'De', 'Categoria', 'Prioridade', 'Departamento', 'Data']
+                df_display = df_display.assign(routing_date=df_display['routing_date'].dt.strftime('%d/%m/%Y %H:%M'))
             
             # Converte para HTML
-            html = df_display.to_html(classes='table table-striped', index=False)
-            
-            return html
+            return self._routing_table_skeleton.format(self._render_table_rows(df_display))
         
         except Exception as e:
             logger.error(f"Erro ao criar tabela de encaminhamentos: {str(e)}")
@@ -409,63 +737,166 @@ class Dashboard:
             if df.empty:
                 return "<p>Sem dados disponíveis</p>"
             
-            # Ordena por data (mais recentes primeiro)
+            # Seleciona os mais recentes sem ordenar todo o histórico
             if 'date' in df.columns:
-                df = df.sort_values('date', ascending=False)
-            
-            # Limita número de linhas
-            df = df.head(max_rows)
+                df = df.nlargest(max_rows, 'date')
+            else:
+                df = df.head(max_rows)
             
             # Seleciona colunas relevantes
             columns = ['title', 'level', 'department', 'date']
-            df_display = df[columns].copy()
+            df_display = df[columns]
             
-            # Formata datas
+            # Formata datas (assign cria novo DataFrame substituindo apenas essa coluna)
             if 'date' in df_display.columns:
-                df_display['date'] = df_display['date'].dt.strftime('%d/%m/%Y %H:%M')
-            
-            # Renomeia colunas
-            df_display.columns = ['Título', 'Nível', 'Departamento', 'Data']
+                df_display = df_display.assign(date=df_display['date'].dt.strftime('%d/%m/%Y %H:%M'))
             
             # Converte para HTML
-            html = df_display.to_html(classes='table table-striped', index=False)
-            
-            return html
+            return self._notification_table_skeleton.format(self._render_table_rows(df_display))
         
         except Exception as e:
             logger.error(f"Erro ao criar tabela de notificações: {str(e)}")
             return f"<p>Erro ao criar tabela: {str(e)}</p>"
     
-    def _update_dashboard(self) -> Tuple[Any, Any, Any, Any, str, str]:
+    def _render_chart(self, create_func: Any, df: pd.DataFrame) -> str:
+        """
+        Cria um gráfico e o serializa uma única vez como SVG embutido em HTML.
+        
+        A marcação gerada fica no cache do dashboard, de modo que atualizações
+        sem mudanças nos históricos não voltam a desenhar a figura.
+        
+        Args:
+            create_func: Função que cria a figura do gráfico
+            df: DataFrame com histórico de encaminhamentos
+            
+        Returns:
+            str: Gráfico em SVG
+        """
+        fig = create_func(df)
+        
+        buffer = io.StringIO()
+        fig.savefig(buffer, format='svg')
+        svg = buffer.getvalue()
+        
+        # Remove cabeçalho XML/DOCTYPE para embutir o SVG diretamente no HTML
+        return svg[svg.find('<svg'):]
+    
+    def _history_files_key(self) -> Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]:
+        """
+        Obtém o estado atual dos arquivos de histórico.
+        
+        Returns:
+            Tuple: (st_mtime_ns, st_size) de cada arquivo, ou None se o arquivo não existir
+        """
+        key = []
+        for path in (self.routing_history_path, self.notification_history_path):
+            try:
+                stat = os.stat(path)
+                key.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                key.append(None)
+        
+        return tuple(key)
+    
+    def _update_dashboard(self) -> Tuple[str, str, str, str, str, str]:
         """
         Atualiza o dashboard.
         
         Returns:
             Tuple: Gráficos e tabelas atualizados
         """
-        # Carrega dados
-        routing_df = self._create_routing_dataframe()
-        notification_df = self._create_notification_dataframe()
+        # Retorna a saída anterior se nenhum histórico mudou
+        key = self._history_files_key()
+        update_cache = self._update_cache
+        if update_cache['key'] == key:
+            return update_cache['value']
+        
+        with self._update_lock:
+            # Outra chamada pode ter atualizado enquanto esta aguardava
+            key = self._history_files_key()
+            if self._update_cache['key'] == key:
+                return self._update_cache['value']
+            
+            value = self._build_dashboard()
+            self._update_cache = {'key': key, 'value': value}
         
-        # Cria gráficos
-        category_chart = self._create_category_chart(routing_df)
-        priority_chart = self._create_priority_chart(routing_df)
-        department_chart = self._create_department_chart(routing_df)
-        timeline_chart = self._create_timeline_chart(routing_df)
+        return value
+    
+    def _build_dashboard(self) -> Tuple[str, str, str, str, str, str]:
+        """
+        Gera gráficos e tabelas a partir dos históricos. Deve ser chamado com
+        _update_lock adquirido.
         
-        # Cria tabelas
+        Returns:
+            Tuple: Gráficos e tabelas atualizados
+        """
+        # Carrega os dois históricos concorrentemente
+        routing_future = self._exec.submit(self._create_routing_dataframe)
+        notification_future = self._exec.submit(self._create_notification_dataframe)
+        routing_df = routing_future.result()
+        notification_df = notification_future.result()
+        
+        # Cria gráficos e tabelas em paralelo (cada tarefa usa sua própria figura;
+        # o lock de atualização impede que duas chamadas usem a mesma)
         max_items = self.dashboard_config.get('max_items_per_page', 20)
-        routing_table = self._create_routing_table(routing_df, max_items)
-        notification_table = self._create_notification_table(notification_df, max_items)
-        
-        return (
-            category_chart,
-            priority_chart,
-            department_chart,
-            timeline_chart,
-            routing_table,
-            notification_table
+        futures = [
+            self._exec.submit(self._render_chart, self._create_category_chart, routing_df),
+            self._exec.submit(self._render_chart, self._create_priority_chart, routing_df),
+            self._exec.submit(self._render_chart, self._create_department_chart, routing_df),
+            self._exec.submit(self._render_chart, self._create_timeline_chart, routing_df),
+            self._exec.submit(self._create_routing_table, routing_df, max_items),
+            self._exec.submit(self._create_notification_table, notification_df, max_items)
+        ]
+        
+        return tuple(future.result() for future in futures)
+    
+    def _watch_history_files(self, interval: float) -> None:
+        """
+        Verifica os arquivos de histórico a cada intervalo e incrementa a versão
+        quando algum deles muda. Uma única thread atende todos os clientes.
+        
+        Args:
+            interval: Intervalo entre verificações em segundos
+        """
+        last_key = self._history_files_key()
+        
+        while True:
+            time.sleep(interval)
+            key = self._history_files_key()
+            
+            if key != last_key:
+                last_key = key
+                self._history_version += 1
+    
+    def _start_history_watcher(self) -> None:
+        """Inicia o observador de históricos, compartilhado por todos os clientes."""
+        if self._watcher_thread is not None:
+            return
+        
+        interval = self.dashboard_config.get('watch_interval', 1)
+        self._watcher_thread = threading.Thread(
+            target=self._watch_history_files, args=(interval,), daemon=True
         )
+        self._watcher_thread.start()
+    
+    def _poll_updates(self, client_version: Optional[int]) -> Tuple:
+        """
+        Atualização periódica de um cliente: envia gráficos e tabelas apenas se
+        os históricos mudaram desde a última versão que o cliente recebeu.
+        
+        Args:
+            client_version: Versão dos históricos exibida pelo cliente
+            
+        Returns:
+            Tuple: Gráficos e tabelas (ou atualizações vazias) e a versão atual
+        """
+        # Lida antes da atualização, para não perder mudanças ocorridas durante ela
+        version = self._history_version
+        
+        if client_version == version:
+            return tuple(gr.update() for _ in range(6)) + (version,)
+        
+        return self._update_dashboard() + (version,)
     
     def launch(self, share: bool = False) -> None:
         """
@@ -486,6 +917,10 @@ class Dashboard:
         # Configuração de gráficos
         charts_config = self.dashboard_config.get('charts', {})
         
+        # Gráficos são gerados como SVG, sem rasterização; textos não viram contornos
+        matplotlib.use('Agg')
+        matplotlib.rcParams['svg.fonttype'] = 'none'
+        
         # Cria interface
         with gr.Blocks(title=title, theme=theme) as interface:
             gr.Markdown(f"# {title}")
@@ -497,20 +932,20 @@ class Dashboard:
                     with gr.Row():
                         with gr.Column():
                             if charts_config.get('show_category_distribution', True):
-                                category_chart = gr.Plot(label="Distribuição de Categorias")
+                                category_chart = gr.HTML(label="Distribuição de Categorias")
                         
                         with gr.Column():
                             if charts_config.get('show_priority_distribution', True):
-                                priority_chart = gr.Plot(label="Distribuição de Prioridades")
+                                priority_chart = gr.HTML(label="Distribuição de Prioridades")
                     
                     with gr.Row():
                         with gr.Column():
                             if charts_config.get('show_department_distribution', True):
-                                department_chart = gr.Plot(label="Distribuição por Departamento")
+                                department_chart = gr.HTML(label="Distribuição por Departamento")
                         
                         with gr.Column():
                             if charts_config.get('show_routing_timeline', True):
-                                timeline_chart = gr.Plot(label="Encaminhamentos por Dia")
+                                timeline_chart = gr.HTML(label="Encaminhamentos por Dia")
                     
                     refresh_button = gr.Button("Atualizar Dashboard")
                 
@@ -522,6 +957,9 @@ class Dashboard:
                     gr.Markdown("## Histórico de Notificações")
                     notification_table = gr.HTML()
             
+            # Versão dos históricos exibida por cada cliente
+            history_version = gr.State(None)
+            
             # Função de atualização
             def update_func():
                 return self._update_dashboard()
@@ -539,38 +977,47 @@ class Dashboard:
                 ]
             )
             
-            # Atualização automática
+            # Atualização inicial
             interface.load(
-                fn=update_func,
+                fn=self._poll_updates,
+                inputs=[history_version],
                 outputs=[
                     category_chart,
                     priority_chart,
                     department_chart,
                     timeline_chart,
                     routing_table,
-                    notification_table
-                ]
+                    notification_table,
+                    history_version
+                ],
+                concurrency_limit=None
             )
             
-            # Configura atualização periódica
+            # Atualização automática a cada refresh_interval: o observador compartilhado
+            # verifica os arquivos e o cliente só recebe dados novos se a versão mudou
             if refresh_interval > 0:
+                self._start_history_watcher()
                 interface.load(
-                    fn=update_func,
+                    fn=self._poll_updates,
+                    inputs=[history_version],
                     outputs=[
                         category_chart,
                         priority_chart,
                         department_chart,
                         timeline_chart,
                         routing_table,
-                        notification_table
+                        notification_table,
+                        history_version
                     ],
-                    every=refresh_interval
+                    every=refresh_interval,
+                    concurrency_limit=None
                 )
         
         # Salva referência à interface
         self.interface = interface
         
-        # Inicia interface
+        # Inicia interface (a fila é necessária para atualizações periódicas)
+        interface.queue()
         interface.launch(share=share)
 
 # Exemplo de uso
@@ -1,19 +1,24 @@
 import os
 import logging
 import numpy as np
-import pickle
 from typing import Dict, List, Any, Optional, Tuple
-from pathlib import Path
 import re
-import json
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.svm import SVC
+import io
+import copy
+import functools
+from enum import IntEnum
+from collections import OrderedDict
+import scipy.sparse as sp
+import joblib
+from joblib import Parallel, delayed, Memory
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.naive_bayes import ComplementNB
+from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, accuracy_score
+from sklearn.metrics import classification_report, confusion_matrix
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
+from sklearn.preprocessing import LabelEncoder
 
 # Configuração de logging
 logging.basicConfig(
@@ -22,11 +27,166 @@ logging.basicConfig(
 )
 logger = logging.getLogger("classifier")
 
+class Category(IntEnum):
+    """Categorias de e-mail tratadas pelas regras de classificação."""
+    NOVO_CONTRATO = 0
+    RENOVACAO = 1
+    ALTERACAO = 2
+    CANCELAMENTO = 3
+    PAGAMENTO = 4
+    DUVIDA = 5
+    RECLAMACAO = 6
+    SUPORTE = 7
+    OUTRO = 8
+
+class Department(IntEnum):
+    """Departamentos de destino dos e-mails."""
+    COMERCIAL = 0
+    JURIDICO = 1
+    FINANCEIRO = 2
+    ATENDIMENTO = 3
+    SUPORTE_TECNICO = 4
+    TRIAGEM = 5
+
+# Conversão entre nomes e identificadores inteiros
+_CATEGORY_IDS = {category.name.lower(): int(category) for category in Category}
+_DEPARTMENT_NAMES = np.array([department.name.lower() for department in Department], dtype=object)
+
+@functools.lru_cache(maxsize=4096)
+def _build_classification_text(subject: str, body: str,
+                               entities: Tuple[Tuple[str, Tuple[str, ...]], ...],
+                               attachments: Tuple[str, ...]) -> str:
+    """
+    Monta o texto de classificação de um e-mail (memoizado).
+    
+    Args:
+        subject: Assunto do e-mail
+        body: Corpo do e-mail
+        entities: Entidades extraídas como tuplas (tipo, valores)
+        attachments: Textos dos anexos processados (já truncados)
+        
+    Returns:
+        str: Texto extraído
+    """
+    buf = io.StringIO()
+    sep = ''
+    
+    # Adiciona assunto (com peso maior: escrito duas vezes)
+    if subject:
+        buf.write(subject)
+        buf.write('\n\n')
+        buf.write(subject)
+        sep = '\n\n'
+    
+    # Adiciona corpo
+    if body:
+        buf.write(sep)
+        buf.write(body)
+        sep = '\n\n'
+    
+    # Adiciona entidades extraídas
+    for entity_type, values in entities:
+        if values:
+            buf.write(sep)
+            buf.write(entity_type)
+            buf.write(': ')
+            buf.write(', '.join(values))
+            sep = '\n\n'
+    
+    # Adiciona texto de anexos processados
+    for attachment_text in attachments:
+        if attachment_text:
+            buf.write(sep)
+            buf.write(attachment_text)
+            sep = '\n\n'
+    
+    return buf.getvalue()
+
+def _fit_transform_texts(vectorizer: Any, texts: Tuple[str, ...]) -> Tuple[Any, Any]:
+    """
+    Ajusta o vetorizador e transforma os textos de treinamento, tokenizando
+    cada texto distinto uma única vez.
+    
+    Args:
+        vectorizer: Vetorizador ainda não ajustado (hashing + TF-IDF)
+        texts: Textos de treinamento
+        
+    Returns:
+        Tuple[Any, Any]: Vetorizador ajustado e matriz TF-IDF
+    """
+    unique_texts = list(dict.fromkeys(texts))
+    counts = vectorizer.named_steps['hash'].transform(unique_texts)
+    
+    # Replica as linhas dos textos repetidos antes do TF-IDF, para que o idf_
+    # continue contando cada e-mail de treinamento
+    if len(unique_texts) < len(texts):
+        position = {text: i for i, text in enumerate(unique_texts)}
+        counts = counts[[position[text] for text in texts]]
+    
+    X = vectorizer.named_steps['tfidf'].fit_transform(counts)
+    return vectorizer, X
+
+def _lazy_model(attr: str) -> property:
+    """
+    Cria uma propriedade que carrega o componente treinado do disco
+    apenas no primeiro acesso.
+    
+    Args:
+        attr: Nome do componente (chave de EmailClassifier._MODEL_FILES)
+        
+    Returns:
+        property: Propriedade com getter preguiçoso e setter
+    """
+    def getter(self):
+        if attr not in self._models:
+            self._models[attr] = self._load_model(attr)
+        return self._models[attr]
+    
+    def setter(self, value):
+        self._models[attr] = value
+    
+    return property(getter, setter)
+
 class EmailClassifier:
     """
     Classe responsável por classificar e-mails relacionados a contratos escolares.
     """
     
+    # Número máximo de linhas TF-IDF mantidas em cache
+    _VECTOR_CACHE_SIZE = 4096
+    
+    # Termos de prazo que tornam um e-mail urgente, combinados em uma única
+    # alternância para varrer cada texto em uma só passada
+    _URGENCY_TERMS = ('urgente', 'imediato')
+    _URGENCY_PATTERN = re.compile('|'.join(map(re.escape, _URGENCY_TERMS)), re.IGNORECASE)
+    
+    # Arquivos de persistência de cada componente treinado
+    _MODEL_FILES = {
+        'vectorizer': 'vectorizer.joblib',
+        'category_model': 'category_model.joblib',
+        'priority_model': 'priority_model.joblib',
+        'department_model': 'department_model.joblib',
+        'category_encoder': 'category_encoder.joblib',
+        'priority_encoder': 'priority_encoder.joblib',
+        'department_encoder': 'department_encoder.joblib'
+    }
+    
+    # Codificador de rótulos usado por cada classificador
+    _MODEL_ENCODERS = {
+        'category_model': 'category_encoder',
+        'priority_model': 'priority_encoder',
+        'department_model': 'department_encoder'
+    }
+    
+    # Componentes treinados (carregados sob demanda)
+    vectorizer = _lazy_model('vectorizer')
+    category_model = _lazy_model('category_model')
+    priority_model = _lazy_model('priority_model')
+    department_model = _lazy_model('department_model')
+    category_encoder = _lazy_model('category_encoder')
+    priority_encoder = _lazy_model('priority_encoder')
+    department_encoder = _lazy_model('department_encoder')
+    
     def __init__(self, model_dir: str = 'models'):
         """
         Inicializa o classificador de e-mails.
@@ -35,15 +195,21 @@ class EmailClassifier:
             model_dir: Diretório para armazenar/carregar modelos
         """
         self.model_dir = model_dir
-        self.category_model = None
-        self.priority_model = None
-        self.department_model = None
+        self._models = {}
+        
+        # Cache de linhas TF-IDF por texto (reclassificação de e-mails já vistos)
+        self._vector_cache = OrderedDict()
+        
+        # Mapa código do codificador -> Category (calculado por codificador)
+        self._category_id_map = None
         
         # Cria diretório de modelos se não existir
         os.makedirs(model_dir, exist_ok=True)
         
-        # Tenta carregar modelos existentes
-        self._load_models()
+        # Cache em disco da vetorização de treinamento: retreinos com os mesmos
+        # textos e parâmetros reaproveitam a matriz já calculada
+        self._memory = Memory(location=os.path.join(model_dir, 'cache'), verbose=0)
+        self._fit_transform_texts = self._memory.cache(_fit_transform_texts)
         
         # Mapeamento de categorias para departamentos
         self.category_to_department = {
@@ -57,71 +223,67 @@ class EmailClassifier:
             'suporte': 'suporte_tecnico',
             'outro': 'triagem'
         }
+        
+        # Departamento por identificador de categoria; a última posição
+        # (índice -1) atende categorias desconhecidas
+        self._cat_to_dept = np.array(
+            [Department[self.category_to_department[category.name.lower()].upper()] for category in Category]
+            + [Department.TRIAGEM],
+            dtype=np.int8
+        )
     
-    def _load_models(self) -> None:
-        """Carrega modelos treinados do disco."""
+    def _load_model(self, attr: str) -> Any:
+        """
+        Carrega um componente treinado do disco.
+        
+        Args:
+            attr: Nome do componente
+            
+        Returns:
+            Any: Componente carregado ou None se indisponível
+        """
+        # Modelos sem o vetorizador compartilhado ou sem o codificador de
+        # rótulos são de um formato antigo
+        if attr != 'vectorizer' and self.vectorizer is None:
+            return None
+        encoder = self._MODEL_ENCODERS.get(attr)
+        if encoder and getattr(self, encoder) is None:
+            return None
+        
+        path = os.path.join(self.model_dir, self._MODEL_FILES[attr])
+        if not os.path.exists(path):
+            return None
+        
         try:
-            # Carrega modelo de categoria
-            category_model_path = os.path.join(self.model_dir, 'category_model.pkl')
-            if os.path.exists(category_model_path):
-                with open(category_model_path, 'rb') as f:
-                    self.category_model = pickle.load(f)
-                logger.info("Modelo de categoria carregado com sucesso")
-            
-            # Carrega modelo de prioridade
-            priority_model_path = os.path.join(self.model_dir, 'priority_model.pkl')
-            if os.path.exists(priority_model_path):
-                with open(priority_model_path, 'rb') as f:
-                    self.priority_model = pickle.load(f)
-                logger.info("Modelo de prioridade carregado com sucesso")
-            
-            # Carrega modelo de departamento
-            department_model_path = os.path.join(self.model_dir, 'department_model.pkl')
-            if os.path.exists(department_model_path):
-                with open(department_model_path, 'rb') as f:
-                    self.department_model = pickle.load(f)
-                logger.info("Modelo de departamento carregado com sucesso")
+            # mmap_mode mapeia os arrays numpy sem copiá-los para a memória,
+            # compartilhando-os entre processos pelo cache de páginas do SO
+            model = joblib.load(path, mmap_mode='r')
+            logger.info(f"{attr} carregado com sucesso")
+            return model
         
         except Exception as e:
-            logger.error(f"Erro ao carregar modelos: {str(e)}")
-            # Reseta modelos em caso de erro
-            self.category_model = None
-            self.priority_model = None
-            self.department_model = None
+            logger.error(f"Erro ao carregar {attr}: {str(e)}")
+            return None
     
     def _save_models(self) -> None:
         """Salva modelos treinados no disco."""
         try:
-            # Salva modelo de categoria
-            if self.category_model:
-                category_model_path = os.path.join(self.model_dir, 'category_model.pkl')
-                with open(category_model_path, 'wb') as f:
-                    pickle.dump(self.category_model, f)
-                logger.info("Modelo de categoria salvo com sucesso")
-            
-            # Salva modelo de prioridade
-            if self.priority_model:
-                priority_model_path = os.path.join(self.model_dir, 'priority_model.pkl')
-                with open(priority_model_path, 'wb') as f:
-                    pickle.dump(self.priority_model, f)
-                logger.info("Modelo de prioridade salvo com sucesso")
-            
-            # Salva modelo de departamento
-            if self.department_model:
-                department_model_path = os.path.join(self.model_dir, 'department_model.pkl')
-                with open(department_model_path, 'wb') as f:
-                    pickle.dump(self.department_model, f)
-                logger.info("Modelo de departamento salvo com sucesso")
+            for attr, filename in self._MODEL_FILES.items():
+                model = self._models.get(attr)
+                if model is not None:
+                    joblib.dump(model, os.path.join(self.model_dir, filename))
+                    logger.info(f"{attr} salvo com sucesso")
         
         except Exception as e:
             logger.error(f"Erro ao salvar modelos: {str(e)}")
     
-    def train(self, training_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def train(self, training_data: List[Dict[str, Any]], return_full_report: bool = False) -> Dict[str, Any]:
         """
         Treina os modelos de classificação.
         
         Args:
             training_data: Lista de e-mails rotulados para treinamento
+            return_full_report: Se True, inclui o classification_report de cada modelo
             
         Returns:
             Dict[str, Any]: Métricas de desempenho dos modelos
@@ -151,14 +313,38 @@ class EmailClassifier:
                 priority_labels.append(email.get('priority', 'normal'))
                 department_labels.append(email.get('department', 'triagem'))
             
-            # Treina modelo de categoria
-            category_metrics = self._train_category_model(texts, category_labels)
+            # Vetoriza os textos uma única vez para os três modelos
+            # (hashing sem vocabulário; apenas o idf_ precisa ser persistido).
+            # float32 reduz pela metade os bytes lidos no predict_proba
+            vectorizer = Pipeline([
+                ('hash', HashingVectorizer(n_features=2 ** 18, alternate_sign=False, ngram_range=(1, 2),
+                                           dtype=np.float32)),
+                ('tfidf', TfidfTransformer())
+            ])
+            self.vectorizer, X = self._fit_transform_texts(vectorizer, tuple(texts))
+            X = X.astype(np.float32, copy=False)
+            self._vector_cache.clear()
             
-            # Treina modelo de prioridade
-            priority_metrics = self._train_priority_model(texts, priority_labels)
+            # Codifica os rótulos como inteiros uma única vez
+            self.category_encoder = LabelEncoder()
+            self.priority_encoder = LabelEncoder()
+            self.department_encoder = LabelEncoder()
+            category_ids = self.category_encoder.fit_transform(category_labels)
+            priority_ids = self.priority_encoder.fit_transform(priority_labels)
+            department_ids = self.department_encoder.fit_transform(department_labels)
             
-            # Treina modelo de departamento
-            department_metrics = self._train_department_model(texts, department_labels)
+            # Treina os três modelos em paralelo (são independentes entre si)
+            (
+                (self.category_model, category_metrics),
+                (self.priority_model, priority_metrics),
+                (self.department_model, department_metrics)
+            ) = Parallel(n_jobs=3, backend='loky')(
+                delayed(fit_fn)(X, labels, class_names, return_full_report) for fit_fn, labels, class_names in [
+                    (self._fit_category_model, category_ids, self.category_encoder.classes_),
+                    (self._fit_priority_model, priority_ids, self.priority_encoder.classes_),
+                    (self._fit_department_model, department_ids, self.department_encoder.classes_)
+                ]
+            )
             
             # Salva modelos
             self._save_models()
@@ -177,116 +363,185 @@ class EmailClassifier:
                 'department': {'accuracy': 0.0, 'report': {}, 'error': str(e)}
             }
     
-    def _train_category_model(self, texts: List[str], labels: List[str]) -> Dict[str, Any]:
+    def partial_train(self, new_emails: List[Dict[str, Any]]) -> int:
+        """
+        Atualiza incrementalmente o modelo de categoria com novos e-mails rotulados,
+        sem retreinar do zero.
+        
+        Args:
+            new_emails: Lista de e-mails rotulados
+            
+        Returns:
+            int: Número de e-mails usados na atualização
+        """
+        if self.vectorizer is None or self.category_model is None:
+            logger.error("Modelo de categoria não treinado; use train() primeiro")
+            return 0
+        
+        try:
+            # Só é possível atualizar categorias já conhecidas pelo modelo
+            known_categories = set(self.category_encoder.classes_[self.category_model.classes_])
+            emails = [email for email in new_emails if email.get('category', 'outro') in known_categories]
+            if len(emails) < len(new_emails):
+                logger.warning(f"{len(new_emails) - len(emails)} e-mails com categorias desconhecidas ignorados "
+                               f"(retreinamento completo necessário)")
+            
+            if not emails:
+                return 0
+            
+            X = self.vectorizer.transform([self._extract_text_for_classification(email) for email in emails])
+            labels = self.category_encoder.transform([email.get('category', 'outro') for email in emails])
+            
+            # Modelos carregados com mmap são somente leitura
+            model = copy.deepcopy(self.category_model)
+            model.partial_fit(X, labels)
+            self.category_model = model
+            
+            self._save_models()
+            
+            logger.info(f"Modelo de categoria atualizado com {len(emails)} e-mails")
+            return len(emails)
+        
+        except Exception as e:
+            logger.error(f"Erro ao atualizar modelo de categoria: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def _evaluate(y_test: np.ndarray, y_pred: np.ndarray, class_names: np.ndarray,
+                  return_full_report: bool = False) -> Dict[str, Any]:
+        """
+        Calcula as métricas de avaliação de um modelo.
+        
+        Args:
+            y_test: Rótulos reais (códigos)
+            y_pred: Rótulos preditos (códigos)
+            class_names: Nomes dos rótulos, indexados pelo código
+            return_full_report: Se True, inclui o classification_report completo
+            
+        Returns:
+            Dict[str, Any]: Acurácia, matriz de confusão e relatório completo ({} se não solicitado)
+        """
+        labels = np.arange(len(class_names))
+        metrics = {
+            'accuracy': float(np.mean(y_test == y_pred)) if len(y_test) else 0.0,
+            'confusion_matrix': confusion_matrix(y_test, y_pred, labels=labels).tolist()
+        }
+        
+        # O relatório por classe é caro; só é montado quando solicitado (senão fica vazio)
+        metrics['report'] = {}
+        if return_full_report:
+            metrics['report'] = classification_report(
+                y_test, y_pred, labels=labels, target_names=class_names,
+                output_dict=True, zero_division=0
+            )
+        
+        return metrics
+    
+    @staticmethod
+    def _fit_category_model(X: Any, labels: np.ndarray, class_names: np.ndarray,
+                            return_full_report: bool = False) -> Tuple[Any, Dict[str, Any]]:
         """
         Treina o modelo de classificação de categoria.
         
         Args:
-            texts: Lista de textos para treinamento
-            labels: Lista de rótulos de categoria
+            X: Matriz TF-IDF dos textos de treinamento
+            labels: Rótulos de categoria codificados como inteiros
+            class_names: Nomes dos rótulos, indexados pelo código
+            return_full_report: Se True, inclui o classification_report completo
             
         Returns:
-            Dict[str, Any]: Métricas de desempenho do modelo
+            Tuple[Any, Dict[str, Any]]: Modelo treinado e métricas de desempenho
         """
         # Divide dados em treino e teste
         X_train, X_test, y_train, y_test = train_test_split(
-            texts, labels, test_size=0.2, random_state=42
+            X, labels, test_size=0.2, random_state=42
         )
         
-        # Cria pipeline de classificação
-        self.category_model = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=5000, ngram_range=(1, 2))),
-            ('clf', MultinomialNB())
-        ])
+        # Cria classificador
+        # ComplementNB lida melhor com classes desbalanceadas e aceita partial_fit
+        model = ComplementNB()
         
         # Treina modelo
-        self.category_model.fit(X_train, y_train)
+        model.fit(X_train, y_train)
         
         # Avalia modelo
-        y_pred = self.category_model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
-        report = classification_report(y_test, y_pred, output_dict=True)
+        y_pred = model.predict(X_test)
+        metrics = EmailClassifier._evaluate(y_test, y_pred, class_names, return_full_report)
         
-        logger.info(f"Modelo de categoria treinado com acurácia: {accuracy:.4f}")
+        logger.info(f"Modelo de categoria treinado com acurácia: {metrics['accuracy']:.4f}")
         
-        return {
-            'accuracy': accuracy,
-            'report': report
-        }
+        return model, metrics
     
-    def _train_priority_model(self, texts: List[str], labels: List[str]) -> Dict[str, Any]:
+    @staticmethod
+    def _fit_priority_model(X: Any, labels: np.ndarray, class_names: np.ndarray,
+                            return_full_report: bool = False) -> Tuple[Any, Dict[str, Any]]:
         """
         Treina o modelo de classificação de prioridade.
         
         Args:
-            texts: Lista de textos para treinamento
-            labels: Lista de rótulos de prioridade
+            X: Matriz TF-IDF dos textos de treinamento
+            labels: Rótulos de prioridade codificados como inteiros
+            class_names: Nomes dos rótulos, indexados pelo código
+            return_full_report: Se True, inclui o classification_report completo
             
         Returns:
-            Dict[str, Any]: Métricas de desempenho do modelo
+            Tuple[Any, Dict[str, Any]]: Modelo treinado e métricas de desempenho
         """
         # Divide dados em treino e teste
         X_train, X_test, y_train, y_test = train_test_split(
-            texts, labels, test_size=0.2, random_state=42
+            X, labels, test_size=0.2, random_state=42
         )
         
-        # Cria pipeline de classificação
-        self.priority_model = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=5000, ngram_range=(1, 2))),
-            ('clf', RandomForestClassifier(n_estimators=100, random_state=42))
-        ])
+        # Cria classificador
+        # n_jobs=-1 paraleliza as árvores; max_depth limita memória e tamanho do modelo
+        model = RandomForestClassifier(
+            n_estimators=100, n_jobs=-1, max_depth=20, max_features='sqrt', random_state=42
+        )
         
         # Treina modelo
-        self.priority_model.fit(X_train, y_train)
+        model.fit(X_train, y_train)
         
         # Avalia modelo
-        y_pred = self.priority_model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
-        report = classification_report(y_test, y_pred, output_dict=True)
+        y_pred = model.predict(X_test)
+        metrics = EmailClassifier._evaluate(y_test, y_pred, class_names, return_full_report)
         
-        logger.info(f"Modelo de prioridade treinado com acurácia: {accuracy:.4f}")
+        logger.info(f"Modelo de prioridade treinado com acurácia: {metrics['accuracy']:.4f}")
         
-        return {
-            'accuracy': accuracy,
-            'report': report
-        }
+        return model, metrics
     
-    def _train_department_model(self, texts: List[str], labels: List[str]) -> Dict[str, Any]:
+    @staticmethod
+    def _fit_department_model(X: Any, labels: np.ndarray, class_names: np.ndarray,
+                              return_full_report: bool = False) -> Tuple[Any, Dict[str, Any]]:
         """
         Treina o modelo de classificação de departamento.
         
         Args:
-            texts: Lista de textos para treinamento
-            labels: Lista de rótulos de departamento
+            X: Matriz TF-IDF dos textos de treinamento
+            labels: Rótulos de departamento codificados como inteiros
+            class_names: Nomes dos rótulos, indexados pelo código
+            return_full_report: Se True, inclui o classification_report completo
             
         Returns:
-            Dict[str, Any]: Métricas de desempenho do modelo
+            Tuple[Any, Dict[str, Any]]: Modelo treinado e métricas de desempenho
         """
         # Divide dados em treino e teste
         X_train, X_test, y_train, y_test = train_test_split(
-            texts, labels, test_size=0.2, random_state=42
+            X, labels, test_size=0.2, random_state=42
         )
         
-        # Cria pipeline de classificação
-        self.department_model = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=5000, ngram_range=(1, 2))),
-            ('clf', SVC(kernel='linear', probability=True, random_state=42))
-        ])
+        # Cria classificador (liblinear opera direto sobre a matriz esparsa)
+        model = LogisticRegression(solver='liblinear', random_state=42, n_jobs=1)
         
         # Treina modelo
-        self.department_model.fit(X_train, y_train)
+        model.fit(X_train, y_train)
         
         # Avalia modelo
-        y_pred = self.department_model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
-        report = classification_report(y_test, y_pred, output_dict=True)
+        y_pred = model.predict(X_test)
+        metrics = EmailClassifier._evaluate(y_test, y_pred, class_names, return_full_report)
         
-        logger.info(f"Modelo de departamento treinado com acurácia: {accuracy:.4f}")
+        logger.info(f"Modelo de departamento treinado com acurácia: {metrics['accuracy']:.4f}")
         
-        return {
-            'accuracy': accuracy,
-            'report': report
-        }
+        return model, metrics
     
     def classify(self, email: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -298,206 +553,241 @@ class EmailClassifier:
         Returns:
             Dict[str, Any]: E-mail com classificações
         """
-        try:
-            # Cria cópia do e-mail para não modificar o original
-            classified_email = email.copy()
+        return self.classify_batch([email])[0]
+    
+    def classify_batch(self, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Classifica um lote de e-mails, chamando cada modelo uma única vez
+        para o lote inteiro.
+        
+        Args:
+            emails: Lista de e-mails a serem classificados
             
+        Returns:
+            List[Dict[str, Any]]: E-mails com classificações
+        """
+        if not emails:
+            return []
+        
+        try:
             # Extrai texto para classificação
-            text = self._extract_text_for_classification(email)
+            texts = [self._extract_text_for_classification(email) for email in emails]
+            
+            # Resolve os componentes uma única vez (propriedades de carga preguiçosa)
+            category_model = self.category_model
+            priority_model = self.priority_model
+            department_model = self.department_model
+            predict = self._predict_with_confidence
+            
+            # Vetoriza o lote uma única vez para todos os modelos
+            X = self._transform_texts(texts) if self.vectorizer is not None else None
+            
+            # Classifica o lote em cada modelo disponível
+            categories = predict(category_model, X) if category_model is not None else None
+            priorities = predict(priority_model, X) if priority_model is not None else None
+            departments = predict(department_model, X) if department_model is not None else None
             
-            # Classifica categoria
-            if self.category_model:
-                category, category_proba = self._classify_category(text)
-                classified_email['ml_category'] = category
-                classified_email['ml_category_confidence'] = category_proba
+            # Categoria
+            # (com identificadores inteiros das categorias, -1 para desconhecidas)
+            if categories is not None:
+                category = self.category_encoder.classes_[categories[0]].astype(object)
+                category_confidence = categories[1].astype(np.float64)
+                category_ids = self._encoder_category_ids()[categories[0]]
             else:
                 # Usa categoria do parser se modelo não estiver disponível
-                classified_email['ml_category'] = email.get('category', 'outro')
-                classified_email['ml_category_confidence'] = email.get('category_confidence', 0.0)
-            
-            # Classifica prioridade
-            if self.priority_model:
-                priority, priority_proba = self._classify_priority(text)
-                classified_email['ml_priority'] = priority
-                classified_email['ml_priority_confidence'] = priority_proba
+                category = np.array([email.get('category', 'outro') for email in emails], dtype=object)
+                category_confidence = np.array([email.get('category_confidence', 0.0) for email in emails], dtype=np.float64)
+                category_ids = np.array([_CATEGORY_IDS.get(c, -1) for c in category], dtype=np.int8)
+            
+            # Prioridade
+            if priorities is not None:
+                priority = self.priority_encoder.classes_[priorities[0]].astype(object)
+                priority_confidence = priorities[1].astype(np.float64)
             else:
                 # Usa prioridade do parser se modelo não estiver disponível
-                classified_email['ml_priority'] = email.get('priority', 'normal')
-                classified_email['ml_priority_confidence'] = 0.0
-            
-            # Classifica departamento
-            if self.department_model:
-                department, department_proba = self._classify_department(text)
-                classified_email['department'] = department
-                classified_email['department_confidence'] = department_proba
+                priority = np.array([email.get('priority', 'normal') for email in emails], dtype=object)
+                priority_confidence = np.zeros(len(emails), dtype=np.float64)
+            
+            # Departamento
+            if departments is not None:
+                department = self.department_encoder.classes_[departments[0]].astype(object)
+                department_confidence = departments[1].astype(np.float64)
             else:
                 # Determina departamento com base na categoria
-                category = classified_email.get('ml_category', 'outro')
-                department = self.category_to_department.get(category, 'triagem')
-                classified_email['department'] = department
-                classified_email['department_confidence'] = classified_email.get('ml_category_confidence', 0.0)
+                department = _DEPARTMENT_NAMES[self._cat_to_dept[category_ids]]
+                department_confidence = category_confidence.copy()
+            
+            results = {
+                'ml_category': category,
+                'ml_category_confidence': category_confidence,
+                'ml_priority': priority,
+                'ml_priority_confidence': priority_confidence,
+                'department': department,
+                'department_confidence': department_confidence
+            }
             
             # Combina classificações de ML com regras baseadas em entidades
-            self._apply_entity_based_rules(classified_email)
+            self._apply_entity_rules_batch(results, category_ids, [email.get('entities', {}) for email in emails])
+            
+            # Monta os dicionários de saída
+            columns = [(key, values.tolist()) for key, values in results.items()]
+            classified_emails = []
+            for i, email in enumerate(emails):
+                # Cria cópia do e-mail para não modificar o original
+                classified_email = email.copy()
+                for key, values in columns:
+                    classified_email[key] = values[i]
+                classified_emails.append(classified_email)
             
-            return classified_email
+            return classified_emails
         
         except Exception as e:
-            logger.error(f"Erro ao classificar e-mail: {str(e)}")
-            # Retorna o e-mail original com classificações padrão
-            email['ml_category'] = email.get('category', 'outro')
-            email['ml_category_confidence'] = email.get('category_confidence', 0.0)
-            email['ml_priority'] = email.get('priority', 'normal')
-            email['ml_priority_confidence'] = 0.0
-            email['department'] = self.category_to_department.get(email.get('category', 'outro'), 'triagem')
-            email['department_confidence'] = 0.0
-            email['classification_error'] = str(e)
-            return email
-    
-    def _classify_category(self, text: str) -> Tuple[str, float]:
+            logger.error(f"Erro ao classificar e-mails: {str(e)}")
+            # Retorna os e-mails originais com classificações padrão
+            for email in emails:
+                email['ml_category'] = email.get('category', 'outro')
+                email['ml_category_confidence'] = email.get('category_confidence', 0.0)
+                email['ml_priority'] = email.get('priority', 'normal')
+                email['ml_priority_confidence'] = 0.0
+                email['department'] = self.category_to_department.get(email.get('category', 'outro'), 'triagem')
+                email['department_confidence'] = 0.0
+                email['classification_error'] = str(e)
+            return emails
+    
+    def _encoder_category_ids(self) -> np.ndarray:
         """
-        Classifica a categoria de um e-mail.
+        Obtém o identificador de Category de cada código do codificador de categorias.
         
-        Args:
-            text: Texto do e-mail
-            
         Returns:
-            Tuple[str, float]: Categoria e confiança
+            np.ndarray: Identificadores indexados pelo código (-1 para desconhecidas)
         """
-        # Prediz categoria
-        category = self.category_model.predict([text])[0]
-        
-        # Obtém probabilidades
-        probas = self.category_model.predict_proba([text])[0]
-        
-        # Obtém índice da categoria predita
-        category_idx = list(self.category_model.classes_).index(category)
-        
-        # Obtém probabilidade da categoria predita
-        category_proba = probas[category_idx]
-        
-        return category, float(category_proba)
+        encoder = self.category_encoder
+        if self._category_id_map is None or self._category_id_map[0] is not encoder:
+            ids = np.array([_CATEGORY_IDS.get(c, -1) for c in encoder.classes_], dtype=np.int8)
+            self._category_id_map = (encoder, ids)
+        return self._category_id_map[1]
     
-    def _classify_priority(self, text: str) -> Tuple[str, float]:
+    @staticmethod
+    def _predict_with_confidence(model: Any, X: Any) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Classifica a prioridade de um e-mail.
+        Prediz rótulos e confianças de um lote com uma única chamada ao modelo.
         
         Args:
-            text: Texto do e-mail
+            model: Classificador treinado
+            X: Matriz TF-IDF dos e-mails
             
         Returns:
-            Tuple[str, float]: Prioridade e confiança
+            Tuple[np.ndarray, np.ndarray]: Códigos dos rótulos e confianças
         """
-        # Prediz prioridade
-        priority = self.priority_model.predict([text])[0]
-        
-        # Obtém probabilidades
-        probas = self.priority_model.predict_proba([text])[0]
+        probas = model.predict_proba(X)
         
-        # Obtém índice da prioridade predita
-        priority_idx = list(self.priority_model.classes_).index(priority)
+        # Rótulo mais provável de cada linha, sem chamar predict separadamente
+        idx = probas.argmax(axis=1)
         
-        # Obtém probabilidade da prioridade predita
-        priority_proba = probas[priority_idx]
-        
-        return priority, float(priority_proba)
+        return model.classes_[idx], np.take_along_axis(probas, idx[:, None], axis=1).ravel()
     
-    def _classify_department(self, text: str) -> Tuple[str, float]:
+    def _extract_text_for_classification(self, email: Dict[str, Any]) -> str:
         """
-        Classifica o departamento de um e-mail.
+        Extrai texto de um e-mail para classificação.
         
         Args:
-            text: Texto do e-mail
+            email: E-mail
             
         Returns:
-            Tuple[str, float]: Departamento e confiança
+            str: Texto extraído
         """
-        # Prediz departamento
-        department = self.department_model.predict([text])[0]
-        
-        # Obtém probabilidades
-        probas = self.department_model.predict_proba([text])[0]
-        
-        # Obtém índice do departamento predito
-        department_idx = list(self.department_model.classes_).index(department)
+        entities = tuple(
+            (entity_type, tuple(values) if values else ())
+            for entity_type, values in email.get('entities', {}).items()
+        )
         
-        # Obtém probabilidade do departamento predito
-        department_proba = probas[department_idx]
+        # Limita o tamanho do texto dos anexos (fatia apenas quando necessário)
+        attachments = tuple(
+            text if len(text) <= 1000 else text[:1000]
+            for text in (attachment.get('text', '') for attachment in email.get('processed_attachments', []))
+        )
         
-        return department, float(department_proba)
+        return _build_classification_text(email.get('subject', ''), email.get('body', ''), entities, attachments)
     
-    def _extract_text_for_classification(self, email: Dict[str, Any]) -> str:
+    def _transform_texts(self, texts: List[str]) -> Any:
         """
-        Extrai texto de um e-mail para classificação.
+        Vetoriza textos reaproveitando linhas TF-IDF já calculadas.
         
         Args:
-            email: E-mail
+            texts: Textos a serem vetorizados
             
         Returns:
-            str: Texto extraído
+            Any: Matriz TF-IDF (CSR) com uma linha por texto
         """
-        texts = []
-        
-        # Adiciona assunto (com peso maior)
-        subject = email.get('subject', '')
-        if subject:
-            texts.append(subject)
-            texts.append(subject)  # Duplica para dar mais peso
-        
-        # Adiciona corpo
-        body = email.get('body', '')
-        if body:
-            texts.append(body)
-        
-        # Adiciona entidades extraídas
-        entities = email.get('entities', {})
-        for entity_type, values in entities.items():
-            if values:
-                entity_text = f"{entity_type}: {', '.join(values)}"
-                texts.append(entity_text)
-        
-        # Adiciona texto de anexos processados
-        if 'processed_attachments' in email:
-            for attachment in email['processed_attachments']:
-                attachment_text = attachment.get('text', '')
-                if attachment_text:
-                    # Limita o tamanho do texto do anexo
-                    texts.append(attachment_text[:1000])
-        
-        # Combina todos os textos
-        return "\n\n".join(texts)
-    
-    def _apply_entity_based_rules(self, email: Dict[str, Any]) -> None:
+        cache = self._vector_cache
+        
+        # Vetoriza apenas os textos ainda não vistos, em uma única chamada
+        missing = [text for text in dict.fromkeys(texts) if text not in cache]
+        X_missing = self.vectorizer.transform(missing) if missing else None
+        rows = dict(zip(missing, X_missing)) if missing else {}
+        
+        for text in texts:
+            if text not in rows:
+                rows[text] = cache[text]
+                cache.move_to_end(text)
+        
+        # Atualiza cache descartando as entradas mais antigas
+        for text in missing:
+            cache[text] = rows[text]
+        while len(cache) > self._VECTOR_CACHE_SIZE:
+            cache.popitem(last=False)
+        
+        # Lote sem repetições nem acertos de cache: usa a matriz diretamente
+        if len(missing) == len(texts):
+            return X_missing
+        
+        return sp.vstack([rows[text] for text in texts], format='csr')
+    
+    def _apply_entity_rules_batch(self, results: Dict[str, np.ndarray], category_ids: np.ndarray,
+                                  entities_list: List[Dict[str, List[str]]]) -> None:
         """
-        Aplica regras baseadas em entidades para refinar classificações.
+        Aplica regras baseadas em entidades para refinar classificações de um lote.
         
         Args:
-            email: E-mail classificado
+            results: Classificações do lote, um array por campo (alterados no lugar)
+            category_ids: Identificadores das categorias (alterados no lugar)
+            entities_list: Entidades extraídas de cada e-mail
         """
-        entities = email.get('entities', {})
+        category = results['ml_category']
+        category_confidence = results['ml_category_confidence']
+        
+        # Flags de presença de entidades, calculadas em uma única passada
+        urgency_search = self._URGENCY_PATTERN.search
+        flags = np.array([
+            (
+                'contract_number' in entities,
+                'value' in entities,
+                bool(entities.get('contract_number')),
+                urgency_search('\n'.join(entities.get('deadline', ()))) is not None
+            )
+            for entities in entities_list
+        ], dtype=bool).reshape(-1, 4)
+        has_contract, has_value, has_contract_values, has_urgent_deadline = flags.T
         
         # Regras para categoria
-        if 'contract_number' in entities and 'value' in entities:
-            if email['ml_category'] == 'outro' or email['ml_category_confidence'] < 0.7:
-                email['ml_category'] = 'pagamento'
-                email['ml_category_confidence'] = max(email['ml_category_confidence'], 0.8)
+        mask = has_contract & has_value & ((category_ids == Category.OUTRO) | (category_confidence < 0.7))
+        category_ids[mask] = Category.PAGAMENTO
+        category[mask] = 'pagamento'
+        category_confidence[mask] = np.maximum(category_confidence[mask], 0.8)
         
         # Regras para prioridade
-        if 'deadline' in entities:
-            for deadline in entities['deadline']:
-                if 'urgente' in deadline.lower() or 'imediato' in deadline.lower():
-                    email['ml_priority'] = 'urgente'
-                    email['ml_priority_confidence'] = 0.9
-                    break
+        results['ml_priority'][has_urgent_deadline] = 'urgente'
+        results['ml_priority_confidence'][has_urgent_deadline] = 0.9
         
         # Regras para departamento
-        if email['ml_category'] == 'pagamento' and email['ml_category_confidence'] > 0.7:
-            email['department'] = 'financeiro'
-            email['department_confidence'] = 0.9
-        elif 'contract_number' in entities and len(entities['contract_number']) > 0:
-            if 'cancelamento' in email['ml_category'] or 'alteracao' in email['ml_category']:
-                email['department'] = 'juridico'
-                email['department_confidence'] = 0.85
+        financial = (category_ids == Category.PAGAMENTO) & (category_confidence > 0.7)
+        legal = ~financial & has_contract_values & (
+            (category_ids == Category.CANCELAMENTO) | (category_ids == Category.ALTERACAO)
+        )
+        results['department'][financial] = 'financeiro'
+        results['department_confidence'][financial] = 0.9
+        results['department'][legal] = 'juridico'
+        results['department_confidence'][legal] = 0.85
 
 # Exemplo de uso
 if __name__ == "__main__":
@@ -1,14 +1,30 @@
 import imaplib
 import email
+import email.message
 import os
 import logging
 import tempfile
 from email.header import decode_header
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, List, Tuple, Optional, Any, Union, Sequence, Callable, Literal
 from abc import ABC, abstractmethod
 import re
 import ssl
+import socket
+import binascii
+import codecs
+import functools
+import asyncio
+import threading
+import time
+import concurrent.futures
+import contextlib
+from collections.abc import Mapping
+
+try:
+    import aioimaplib
+except ImportError:  # dependência opcional, necessária apenas para o provedor assíncrono
+    aioimaplib = None
 
 # Configuração de logging
 logging.basicConfig(
@@ -17,6 +33,180 @@ logging.basicConfig(
 )
 logger = logging.getLogger("email_connector")
 
+# Tamanho (em caracteres base64, múltiplo de 4) de cada bloco decodificado de anexos
+_DECODE_CHUNK_SIZE = 64 * 1024
+
+# Buffer de escrita dos arquivos temporários de anexos
+_ATTACHMENT_WRITE_BUFFER = 1 << 20
+
+def _write_base64(encoded: str, fileobj: Any) -> int:
+    """
+    Decodifica texto base64 em blocos, gravando cada bloco diretamente no arquivo.
+    
+    Args:
+        encoded: Conteúdo codificado em base64
+        fileobj: Arquivo binário de destino
+    
+    Returns:
+        int: Número de bytes gravados
+    
+    Raises:
+        binascii.Error: Se o conteúdo não for base64 válido
+    """
+    size = 0
+    carry = ''
+    
+    for start in range(0, len(encoded), _DECODE_CHUNK_SIZE):
+        # Remove quebras de linha e mantém apenas grupos completos de 4 caracteres
+        chunk = carry + ''.join(encoded[start:start + _DECODE_CHUNK_SIZE].split())
+        cut = len(chunk) - len(chunk) % 4
+        carry = chunk[cut:]
+        
+        if cut:
+            data = binascii.a2b_base64(chunk[:cut])
+            fileobj.write(data)
+            size += len(data)
+    
+    # Grupo final incompleto (padding ausente)
+    if carry:
+        data = binascii.a2b_base64(carry + '=' * (-len(carry) % 4))
+        fileobj.write(data)
+        size += len(data)
+    
+    return size
+
+def _write_part_payload(part: email.message.Message, fileobj: Any) -> int:
+    """
+    Grava o conteúdo decodificado de uma parte MIME em um arquivo. Anexos em
+    base64 são decodificados em blocos, sem materializar o conteúdo inteiro.
+    
+    Args:
+        part: Parte MIME
+        fileobj: Arquivo binário de destino
+    
+    Returns:
+        int: Número de bytes gravados
+    """
+    encoding = str(part.get('Content-Transfer-Encoding', '')).strip().lower()
+    encoded = part.get_payload(decode=False)
+    
+    if encoding == 'base64' and isinstance(encoded, str):
+        try:
+            return _write_base64(encoded, fileobj)
+        except binascii.Error:
+            # Conteúdo malformado: recomeça com a decodificação tolerante da biblioteca
+            fileobj.seek(0)
+            fileobj.truncate()
+    
+    payload = part.get_payload(decode=True) or b''
+    fileobj.write(payload)
+    return len(payload)
+
+@functools.lru_cache(maxsize=None)
+def _decoder(charset: Optional[str]) -> Callable[..., Tuple[str, int]]:
+    """
+    Obtém (uma única vez por charset) a função de decodificação de um charset.
+    
+    Args:
+        charset: Nome do charset (None para utf-8)
+    
+    Returns:
+        Callable[..., Tuple[str, int]]: Decodificador do módulo codecs; utf-8 se o charset for desconhecido
+    """
+    try:
+        return codecs.getdecoder(charset or 'utf-8')
+    except LookupError:
+        return codecs.getdecoder('utf-8')
+
+def _decode_payload(payload: Optional[bytes], charset: Optional[str]) -> str:
+    """
+    Decodifica o conteúdo de uma parte de texto, substituindo bytes inválidos.
+    
+    Args:
+        payload: Conteúdo em bytes
+        charset: Charset declarado na parte
+    
+    Returns:
+        str: Texto decodificado
+    """
+    if not payload:
+        return ""
+    return _decoder(charset)(payload, 'replace')[0]
+
+@functools.lru_cache(maxsize=4096)
+def _decode_encoded_header(header: str) -> str:
+    """
+    Decodifica um cabeçalho com encoded-words RFC 2047 (memoizado: remetentes
+    e assuntos se repetem entre mensagens de uma mesma conversa).
+    
+    Args:
+        header: Cabeçalho a ser decodificado
+    
+    Returns:
+        str: Cabeçalho decodificado
+    """
+    try:
+        decoded_header = decode_header(header)
+        parts = []
+        
+        for part, encoding in decoded_header:
+            if isinstance(part, bytes):
+                parts.append(_decode_payload(part, encoding))
+            else:
+                parts.append(part)
+        
+        return " ".join(parts)
+    
+    except Exception as e:
+        logger.error(f"Erro ao decodificar cabeçalho: {str(e)}")
+        return header
+
+def _decode_header(header: Optional[Any]) -> str:
+    """
+    Decodifica um cabeçalho de e-mail.
+    
+    Args:
+        header: Cabeçalho a ser decodificado
+    
+    Returns:
+        str: Cabeçalho decodificado
+    """
+    if not header:
+        return ""
+    
+    # Objetos Header (cabeçalhos com bytes 8-bit) não são hashable: sem cache
+    if not isinstance(header, str):
+        return _decode_encoded_header.__wrapped__(header)
+    
+    # Caminho rápido: sem encoded-words não há nada a decodificar
+    if '=?' not in header:
+        return header
+    
+    return _decode_encoded_header(header)
+
+# Resultado de SEARCH com critério MODSEQ (RFC 7162): "2 5 6 (MODSEQ 917162500)"
+_MODSEQ_PATTERN = re.compile(rb'\(MODSEQ (\d+)\)')
+
+# UID de uma resposta FETCH: b'12 (UID 4827 RFC822 {3150}'
+_FETCH_UID_PATTERN = re.compile(rb'\bUID (\d+)')
+
+# Resultado de SEARCH RETURN (COUNT) (RFC 4731): '(TAG "A3") COUNT 12'
+_ESEARCH_COUNT_PATTERN = re.compile(rb'\bCOUNT (\d+)')
+
+def _message_set(email_ids: Union[str, bytes, Sequence[Union[str, bytes]]]) -> str:
+    """
+    Monta um conjunto de mensagens IMAP (ids separados por vírgula).
+    
+    Args:
+        email_ids: ID único ou sequência de IDs
+    
+    Returns:
+        str: Conjunto de mensagens para um único comando IMAP
+    """
+    if isinstance(email_ids, (str, bytes)):
+        email_ids = [email_ids]
+    return ",".join(i.decode() if isinstance(i, bytes) else str(i) for i in email_ids)
+
 class EmailProviderInterface(ABC):
     """Interface para provedores de e-mail."""
     
@@ -36,19 +226,312 @@ class EmailProviderInterface(ABC):
         pass
     
     @abstractmethod
-    def mark_as_read(self, email_id: str) -> bool:
-        """Marca um e-mail como lido."""
+    def mark_as_read(self, email_ids: Union[str, Sequence[str]]) -> bool:
+        """Marca um ou mais e-mails como lidos."""
         pass
     
     @abstractmethod
-    def move_to_folder(self, email_id: str, folder: str) -> bool:
-        """Move um e-mail para uma pasta específica."""
+    def move_to_folder(self, email_ids: Union[str, Sequence[str]], folder: str) -> bool:
+        """Move um ou mais e-mails para uma pasta específica."""
         pass
 
-class IMAPEmailProvider(EmailProviderInterface):
+class LazyEmail(Mapping):
+    """
+    E-mail com campos decodificados sob demanda. A mensagem é analisada uma
+    única vez; cabeçalhos são decodificados e a árvore MIME (corpo e anexos)
+    percorrida apenas quando acessados.
+    
+    Também se comporta como um dicionário somente leitura com as chaves
+    'id', 'subject', 'from', 'to', 'date', 'body' e 'attachments'. Testes de
+    pertinência ('body' in email) não extraem o conteúdo; use to_dict() para
+    obter um dict comum (ex.: para json.dumps ou para alterar campos).
+    """
+    
+    _KEYS = ('id', 'subject', 'from', 'to', 'date', 'body', 'attachments')
+    
+    def __init__(self, msg: email.message.Message, email_id: str, parser: '_EmailMessageParser',
+                 load_message: Optional[Callable[[], Optional[email.message.Message]]] = None):
+        """
+        Inicializa o e-mail.
+        
+        Args:
+            msg: Mensagem já analisada
+            email_id: ID do e-mail
+            parser: Objeto responsável pela extração de corpo e anexos
+            load_message: Carrega a mensagem completa quando msg contém apenas os cabeçalhos
+        """
+        self._msg = msg
+        self._parser = parser
+        self._load_message = load_message
+        self.id = email_id
+    
+    @functools.cached_property
+    def subject(self) -> str:
+        return _decode_header(self._msg["Subject"])
+    
+    @functools.cached_property
+    def from_(self) -> str:
+        return _decode_header(self._msg["From"])
+    
+    @functools.cached_property
+    def to(self) -> str:
+        return _decode_header(self._msg["To"])
+    
+    @functools.cached_property
+    def date(self) -> str:
+        return _decode_header(self._msg["Date"])
+    
+    @functools.cached_property
+    def _content(self) -> Tuple[str, List[Dict[str, Any]]]:
+        msg = self._msg
+        
+        # Apenas cabeçalhos foram baixados: busca o restante da mensagem agora
+        if self._load_message is not None:
+            msg = self._load_message()
+            if msg is None:
+                # Um corpo vazio seria indistinguível de um e-mail sem texto
+                raise RuntimeError(f"Não foi possível obter o texto do e-mail {self.id} "
+                                   "(o corpo deve ser acessado antes de disconnect())")
+        
+        try:
+            return self._parser._extract_content(msg)
+        except Exception as e:
+            logger.error(f"Erro ao extrair conteúdo do e-mail {self.id}: {str(e)}")
+            return "", []
+    
+    @property
+    def body(self) -> str:
+        return self._content[0]
+    
+    @property
+    def attachments(self) -> List[Dict[str, Any]]:
+        return self._content[1]
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, 'from_' if key == 'from' else key)
+    
+    def __contains__(self, key: object) -> bool:
+        # Mapping.__contains__ chamaria __getitem__, extraindo o conteúdo
+        return key in self._KEYS
+    
+    def __iter__(self):
+        return iter(self._KEYS)
+    
+    def __len__(self) -> int:
+        return len(self._KEYS)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Materializa todos os campos em um dicionário comum.
+        
+        Returns:
+            Dict[str, Any]: Dicionário com metadados e conteúdo do e-mail
+        """
+        return {key: self[key] for key in self._KEYS}
+    
+    def copy(self) -> Dict[str, Any]:
+        """
+        Materializa todos os campos em um dicionário comum (o mesmo que to_dict()).
+        
+        Returns:
+            Dict[str, Any]: Dicionário com metadados e conteúdo do e-mail
+        """
+        return self.to_dict()
+
+class _EmailMessageParser:
+    """Conversão de mensagens brutas em dicionários, comum aos provedores IMAP."""
+    
+    # Pool compartilhado para gravar anexos em disco enquanto a árvore MIME é percorrida
+    _io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="attachment-io")
+    
+    def _process_email(self, raw_email: bytes, email_id: str,
+                       load_text: Optional[Callable[[], Optional[bytes]]] = None) -> Optional[LazyEmail]:
+        """
+        Analisa um e-mail bruto. Metadados, corpo e anexos são extraídos apenas
+        quando acessados.
+        
+        Args:
+            raw_email: E-mail bruto em bytes (ou apenas o bloco de cabeçalhos)
+            email_id: ID do e-mail
+            load_text: Obtém o texto da mensagem quando raw_email contém apenas os cabeçalhos
+        
+        Returns:
+            Optional[LazyEmail]: E-mail com acesso por atributo ou por chave, ou None em caso de erro
+        """
+        try:
+            msg = email.message_from_bytes(raw_email)
+            
+            load_message = None
+            if load_text is not None:
+                def load_message() -> Optional[email.message.Message]:
+                    text = load_text()
+                    return email.message_from_bytes(raw_email + text) if text is not None else None
+            
+            return LazyEmail(msg, email_id.decode() if isinstance(email_id, bytes) else email_id, self,
+                             load_message)
+        
+        except Exception as e:
+            logger.error(f"Erro ao processar e-mail: {str(e)}")
+            return None
+    
+    def _extract_content(self, msg: email.message.Message) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Extrai o corpo e anexos de um e-mail.
+        
+        Args:
+            msg: Mensagem de e-mail
+        
+        Returns:
+            Tuple[str, List[Dict[str, Any]]]: Corpo do e-mail e lista de anexos
+        """
+        body = ""
+        body_parts = []
+        html_parts = []
+        attachments = []
+        pending_writes = []
+        
+        # Se a mensagem é multipart
+        if msg.is_multipart():
+            # Itera sobre as partes
+            for part in msg.walk():
+                # Pula contêineres multipart e partes vazias antes de qualquer outra consulta
+                if part.is_multipart() or part.get_payload() is None:
+                    continue
+                
+                content_type = part.get_content_type()
+                disposition = part.get_content_disposition()
+                
+                # Verifica se é um anexo
+                if disposition in ('attachment', 'inline'):
+                    # Extrai informações do anexo
+                    filename = part.get_filename()
+                    if not filename:
+                        # Gera um nome de arquivo se não houver
+                        ext = content_type.split('/')[-1]
+                        filename = f"attachment-{len(attachments)}.{ext}"
+                    
+                    # Salva o anexo em um arquivo temporário em segundo plano
+                    pending_writes.append(self._io_pool.submit(self._write_attachment, part, filename))
+                    
+                    # Adiciona informações do anexo à lista (caminho e tamanho após a gravação)
+                    attachments.append({
+                        "filename": filename,
+                        "content_type": content_type
+                    })
+                
+                # Verifica se é texto
+                elif content_type == "text/plain":
+                    # Adiciona ao corpo do e-mail
+                    body_parts.append(_decode_payload(part.get_payload(decode=True), part.get_content_charset()))
+                
+                # Verifica se é HTML
+                elif content_type == "text/html":
+                    # Guarda o HTML, usado como corpo apenas se não houver texto plano
+                    html_parts.append(_decode_payload(part.get_payload(decode=True), part.get_content_charset()))
+            
+            # Junta os fragmentos uma única vez; sem texto plano, usa apenas a primeira parte HTML
+            body = "".join(body_parts or html_parts[:1])
+            
+            # Aguarda a gravação dos anexos; uma falha descarta apenas o anexo afetado
+            written_attachments = []
+            for attachment, future in zip(attachments, pending_writes):
+                try:
+                    attachment["path"], attachment["size"] = future.result()
+                except Exception as e:
+                    logger.error(f"Erro ao gravar anexo {attachment['filename']}: {str(e)}")
+                    continue
+                
+                written_attachments.append(attachment)
+            
+            attachments = written_attachments
+        
+        # Se a mensagem não é multipart
+        else:
+            # Extrai o corpo
+            body = _decode_payload(msg.get_payload(decode=True), msg.get_content_charset())
+        
+        return body, attachments
+    
+    @staticmethod
+    def _write_attachment(part: email.message.Message, filename: str) -> Tuple[str, int]:
+        """
+        Salva o conteúdo de um anexo em um arquivo temporário, decodificando em blocos.
+        
+        Args:
+            part: Parte MIME do anexo
+            filename: Nome do arquivo do anexo
+        
+        Returns:
+            Tuple[str, int]: Caminho do arquivo temporário e número de bytes gravados
+        """
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}",
+                                           buffering=_ATTACHMENT_WRITE_BUFFER)
+        
+        try:
+            with temp:
+                size = _write_part_payload(part, temp)
+        except BaseException:
+            # Remove o arquivo parcialmente gravado
+            try:
+                os.unlink(temp.name)
+            except OSError:
+                pass
+            raise
+        
+        return temp.name, size
+
+# Buffer de leitura das respostas IMAP e buffer de recepção do kernel
+_IMAP_READ_BUFFER = 1 << 18
+_IMAP_RCVBUF = 1 << 20
+
+class _BufferedIMAPMixin:
+    """
+    Amplia os buffers de leitura da conexão IMAP: FETCHs grandes passam a
+    exigir bem menos chamadas recv.
+    """
+    
+    def open(self, *args, **kwargs):
+        super().open(*args, **kwargs)
+        
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _IMAP_RCVBUF)
+        except OSError as e:
+            logger.debug(f"Não foi possível ajustar SO_RCVBUF: {str(e)}")
+        
+        # Substitui o arquivo de leitura padrão (buffer de 8 KB)
+        self.file.close()
+        self.file = self.sock.makefile('rb', buffering=_IMAP_READ_BUFFER)
+
+class _BufferedIMAP4(_BufferedIMAPMixin, imaplib.IMAP4):
+    pass
+
+class _BufferedIMAP4_SSL(_BufferedIMAPMixin, imaplib.IMAP4_SSL):
+    pass
+
+def _serialized(method: Callable) -> Callable:
+    """
+    Executa o método com o lock de comandos do provedor adquirido: uma conexão
+    imaplib não pode receber comandos de duas threads ao mesmo tempo (por
+    exemplo, o texto de e-mails baixados só com cabeçalhos, buscado na thread
+    que acessa o corpo).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._command_lock:
+            return method(self, *args, **kwargs)
+    
+    return wrapper
+
+class IMAPEmailProvider(_EmailMessageParser, EmailProviderInterface):
     """Implementação de provedor de e-mail usando IMAP."""
     
-    def __init__(self, server: str, username: str, password: str, port: int = 993, use_ssl: bool = True):
+    # Número máximo de mensagens por comando FETCH (evita limites de tamanho de requisição do servidor)
+    FETCH_BATCH_SIZE = 100
+    
+    def __init__(self, server: str, username: str, password: str, port: int = 993, use_ssl: bool = True,
+                 keep_alive: bool = False, incremental_sync: bool = False):
         """
         Inicializa o provedor IMAP.
         
@@ -58,19 +541,35 @@ class IMAPEmailProvider(EmailProviderInterface):
             password: Senha para autenticação
             port: Porta do servidor (padrão: 993 para SSL)
             use_ssl: Se deve usar SSL para conexão
+            keep_alive: Se a sessão deve sobreviver a disconnect() (conexões do pool)
+            incremental_sync: Se get_unread_emails deve retornar apenas mensagens
+                novas (UID acima do último entregue) ou, com CONDSTORE no
+                servidor, alteradas desde a última busca
         """
         self.server = server
         self.username = username
         self.password = password
         self.port = port
         self.use_ssl = use_ssl
+        self.keep_alive = keep_alive
+        self.incremental_sync = incremental_sync
         self.mail = None
         self.connected = False
+        self.capabilities = frozenset()
+        self.last_seen_modseq = None
+        
+        # Serializa os comandos enviados à conexão (ver _serialized)
+        self._command_lock = threading.RLock()
+        self.uidvalidity = None
+        
+        # Estado de sincronização por caixa: {'uidvalidity': int, 'last_uid': int}
+        self.sync_state = {}
         
         # Validar parâmetros
         if not server or not username or not password:
             raise ValueError("Servidor, usuário e senha são obrigatórios")
     
+    @_serialized
     def connect(self) -> bool:
         """
         Conecta ao servidor IMAP.
@@ -78,6 +577,10 @@ class IMAPEmailProvider(EmailProviderInterface):
         Returns:
             bool: True se a conexão foi bem-sucedida, False caso contrário
         """
+        # Sessões persistentes já conectadas são reaproveitadas
+        if self.keep_alive and self.connected and self.mail:
+            return True
+        
         try:
             # Criar contexto SSL personalizado para lidar com certificados antigos
             if self.use_ssl:
@@ -85,13 +588,20 @@ class IMAPEmailProvider(EmailProviderInterface):
                 # Desativar verificação de certificado se necessário (não recomendado para produção)
                 # context.check_hostname = False
                 # context.verify_mode = ssl.CERT_NONE
-                self.mail = imaplib.IMAP4_SSL(self.server, self.port, ssl_context=context)
+                self.mail = _BufferedIMAP4_SSL(self.server, self.port, ssl_context=context)
             else:
-                self.mail = imaplib.IMAP4(self.server, self.port)
+                self.mail = _BufferedIMAP4(self.server, self.port)
             
             # Login
             self.mail.login(self.username, self.password)
             self.connected = True
+            
+            # Servidores podem anunciar extensões adicionais após a autenticação
+            status, data = self.mail.capability()
+            if status == 'OK' and data and data[-1]:
+                self.capabilities = frozenset(data[-1].decode().upper().split())
+            else:
+                self.capabilities = frozenset(self.mail.capabilities)
             logger.info(f"Conectado com sucesso ao servidor IMAP: {self.server}")
             return True
         
@@ -102,7 +612,21 @@ class IMAPEmailProvider(EmailProviderInterface):
     
     def disconnect(self) -> bool:
         """
-        Desconecta do servidor IMAP.
+        Desconecta do servidor IMAP. Sessões persistentes (keep_alive) são
+        mantidas abertas; use close() para encerrá-las.
+        
+        Returns:
+            bool: True se a desconexão foi bem-sucedida, False caso contrário
+        """
+        if self.keep_alive:
+            return True
+        
+        return self.close()
+    
+    @_serialized
+    def close(self) -> bool:
+        """
+        Encerra a sessão IMAP, inclusive as persistentes.
         
         Returns:
             bool: True se a desconexão foi bem-sucedida, False caso contrário
@@ -120,21 +644,31 @@ class IMAPEmailProvider(EmailProviderInterface):
             logger.error(f"Erro ao desconectar do servidor IMAP: {str(e)}")
             return False
     
-    def get_unread_emails(self, limit: int = 10) -> List[Dict[str, Any]]:
+    @_serialized
+    def get_unread_emails(self, limit: int = 10,
+                          fetch_mode: Literal['headers', 'full'] = 'full') -> List[Dict[str, Any]]:
         """
         Obtém e-mails não lidos da caixa de entrada.
         
         Args:
             limit: Número máximo de e-mails a serem obtidos
+            fetch_mode: 'full' baixa a mensagem inteira; 'headers' baixa apenas os
+                cabeçalhos (BODY.PEEK[HEADER]) e busca o texto somente se corpo ou
+                anexos forem acessados
         
         Returns:
             List[Dict[str, Any]]: Lista de e-mails não lidos com metadados
         """
+        if fetch_mode not in ('headers', 'full'):
+            raise ValueError(f"Modo de busca inválido: {fetch_mode}")
+        
         if not self.connected or not self.mail:
             logger.error("Não conectado ao servidor IMAP")
             return []
         
         emails = []
+        headers_only = fetch_mode == 'headers'
+        query = "(UID BODY.PEEK[HEADER])" if headers_only else "(UID RFC822)"
         
         try:
             # Seleciona a caixa de entrada
@@ -144,51 +678,209 @@ class IMAPEmailProvider(EmailProviderInterface):
                 logger.error(f"Erro ao selecionar caixa de entrada: {messages}")
                 return []
             
-            # Busca e-mails não lidos
-            status, messages = self.mail.search(None, 'UNSEEN')
+            state = self._sync_state("INBOX")
+            
+            # Busca e-mails não lidos por UID (estáveis entre reconexões); em
+            # sincronização incremental, apenas os alterados desde a última busca
+            # (o critério MODSEQ habilita o CONDSTORE) ou, sem CONDSTORE, os novos
+            condstore = self.incremental_sync and 'CONDSTORE' in self.capabilities
+            if condstore:
+                # MODSEQ seleciona mensagens com valor maior ou igual ao informado
+                status, messages = self.mail.uid('SEARCH', None, 'UNSEEN', 'MODSEQ',
+                                                 str((self.last_seen_modseq or 0) + 1))
+            elif self.incremental_sync and state['last_uid']:
+                status, messages = self.mail.uid('SEARCH', None, 'UID', f"{state['last_uid'] + 1}:*", 'UNSEEN')
+            else:
+                status, messages = self.mail.uid('SEARCH', None, 'UNSEEN')
             
             if status != 'OK':
                 logger.error(f"Erro ao buscar e-mails não lidos: {messages}")
                 return []
             
-            # Obtém IDs de e-mails
-            email_ids = messages[0].split()
+            # Obtém UIDs dos e-mails (e o maior MODSEQ entre eles, se presente)
+            result = messages[0] or b''
+            modseq = _MODSEQ_PATTERN.search(result)
+            email_ids = sorted(_MODSEQ_PATTERN.sub(b'', result).split(), key=int)
+            
+            # "<n>:*" sempre inclui a última mensagem da caixa, mesmo com UID menor que n
+            if self.incremental_sync and not condstore:
+                email_ids = [uid for uid in email_ids if int(uid) > state['last_uid']]
             
             # Limita o número de e-mails
-            if limit > 0:
+            truncated = limit > 0 and len(email_ids) > limit
+            if truncated:
                 email_ids = email_ids[:limit]
             
-            for email_id in email_ids:
+            # UIDs buscados e analisados com sucesso
+            delivered = set()
+            
+            # Busca os e-mails em lotes, um único FETCH (uma ida e volta) por lote
+            for start in range(0, len(email_ids), self.FETCH_BATCH_SIZE):
+                batch = email_ids[start:start + self.FETCH_BATCH_SIZE]
+                
                 try:
-                    status, msg_data = self.mail.fetch(email_id, "(RFC822)")
+                    status, msg_data = self.mail.uid('FETCH', b",".join(batch), query)
                     
                     if status != 'OK':
-                        logger.error(f"Erro ao buscar e-mail {email_id}: {msg_data}")
+                        logger.error(f"Erro ao buscar e-mails {batch[0]}..{batch[-1]}: {msg_data}")
                         continue
                     
+                    # A resposta alterna tuplas (b'<seq> (UID x RFC822 {n}', conteúdo) e separadores b')'
                     for response_part in msg_data:
                         if isinstance(response_part, tuple):
+                            uid = _FETCH_UID_PATTERN.search(response_part[0])
+                            if not uid:
+                                continue
+                            email_id = uid.group(1)
+                            load_text = functools.partial(self._fetch_text, email_id) if headers_only else None
                             # Processa o e-mail
-                            email_data = self._process_email(response_part[1], email_id)
+                            email_data = self._process_email(response_part[1], email_id, load_text)
                             if email_data:
                                 emails.append(email_data)
+                                delivered.add(email_id)
                 
                 except Exception as e:
-                    logger.error(f"Erro ao processar e-mail {email_id}: {str(e)}")
+                    logger.error(f"Erro ao processar e-mails {batch[0]}..{batch[-1]}: {str(e)}")
+                    self._note_session_error(e)
+                    if not self.connected:
+                        break
+            
+            # Avança o ponto de sincronização somente até o último UID de uma sequência
+            # sem falhas: mensagens cujo FETCH falhou são buscadas de novo na próxima vez
+            for uid in email_ids:
+                if uid not in delivered:
+                    break
+                state['last_uid'] = max(state['last_uid'], int(uid))
+            else:
+                if condstore and modseq and not truncated:
+                    self.last_seen_modseq = int(modseq.group(1))
             
             logger.info(f"Obtidos {len(emails)} e-mails não lidos")
             return emails
         
         except imaplib.IMAP4.error as e:
             logger.error(f"Erro ao obter e-mails não lidos: {str(e)}")
+            self._note_session_error(e)
             return []
     
-    def mark_as_read(self, email_id: str) -> bool:
+    def _note_session_error(self, error: BaseException) -> None:
+        """
+        Marca a sessão como desconectada se o erro indica conexão perdida
+        (IMAP4.abort ou erro de socket), para que seja reaberta antes do próximo uso.
+        
+        Args:
+            error: Exceção capturada
+        """
+        if isinstance(error, (imaplib.IMAP4.abort, OSError)):
+            self.connected = False
+    
+    def _sync_state(self, mailbox: str) -> Dict[str, int]:
         """
-        Marca um e-mail como lido.
+        Obtém o estado de sincronização da caixa recém-selecionada, descartando-o
+        se o UIDVALIDITY mudou (UIDs antigos deixam de ser válidos).
         
         Args:
-            email_id: ID do e-mail a ser marcado
+            mailbox: Nome da caixa selecionada
+        
+        Returns:
+            Dict[str, int]: Estado com 'uidvalidity' e 'last_uid'
+        """
+        _, data = self.mail.response('UIDVALIDITY')
+        self.uidvalidity = int(data[-1]) if data and data[-1] else None
+        
+        state = self.sync_state.get(mailbox)
+        if state is None or state['uidvalidity'] != self.uidvalidity:
+            if state is not None:
+                logger.warning(f"UIDVALIDITY de {mailbox} mudou; reiniciando sincronização")
+                self.last_seen_modseq = None
+            state = {'uidvalidity': self.uidvalidity, 'last_uid': 0}
+            self.sync_state[mailbox] = state
+        
+        return state
+    
+    @_serialized
+    def count_unread(self) -> int:
+        """
+        Conta os e-mails não lidos da caixa de entrada. Com ESEARCH, o servidor
+        devolve apenas o total, sem a lista de números de sequência.
+        
+        Returns:
+            int: Número de e-mails não lidos, ou -1 em caso de erro
+        """
+        if not self.connected or not self.mail:
+            logger.error("Não conectado ao servidor IMAP")
+            return -1
+        
+        try:
+            status, messages = self.mail.select("INBOX")
+            
+            if status != 'OK':
+                logger.error(f"Erro ao selecionar caixa de entrada: {messages}")
+                return -1
+            
+            if 'ESEARCH' in self.capabilities:
+                status, messages = self.mail._simple_command('SEARCH', 'RETURN', '(COUNT)', 'UNSEEN')
+                if status == 'OK':
+                    _, messages = self.mail._untagged_response(status, messages, 'ESEARCH')
+                    count = _ESEARCH_COUNT_PATTERN.search(messages[-1] or b'')
+                    if count:
+                        return int(count.group(1))
+            
+            # Sem ESEARCH (ou resposta inesperada): conta a lista completa
+            status, messages = self.mail.search(None, 'UNSEEN')
+            
+            if status != 'OK':
+                logger.error(f"Erro ao contar e-mails não lidos: {messages}")
+                return -1
+            
+            return len(messages[0].split())
+        
+        except imaplib.IMAP4.error as e:
+            logger.error(f"Erro ao contar e-mails não lidos: {str(e)}")
+            self._note_session_error(e)
+            return -1
+    
+    @_serialized
+    def _fetch_text(self, email_id: Union[str, bytes]) -> Optional[bytes]:
+        """
+        Obtém o texto (tudo após os cabeçalhos) de um e-mail sem marcá-lo como lido.
+        
+        Args:
+            email_id: ID do e-mail
+        
+        Returns:
+            Optional[bytes]: Texto bruto da mensagem, ou None em caso de erro
+        """
+        if not self.connected or not self.mail:
+            logger.error(f"Não conectado ao servidor IMAP; o corpo do e-mail {email_id} "
+                         "deve ser acessado antes de disconnect()")
+            return None
+        
+        try:
+            status, msg_data = self.mail.uid('FETCH', email_id, "(BODY.PEEK[TEXT])")
+            
+            if status != 'OK':
+                logger.error(f"Erro ao buscar texto do e-mail {email_id}: {msg_data}")
+                return None
+            
+            for response_part in msg_data:
+                if isinstance(response_part, tuple):
+                    return response_part[1]
+            
+            return b""
+        
+        except (imaplib.IMAP4.error, OSError) as e:
+            logger.error(f"Erro ao buscar texto do e-mail {email_id}: {str(e)}")
+            self._note_session_error(e)
+            return None
+    
+    @_serialized
+    def mark_as_read(self, email_ids: Union[str, Sequence[str]]) -> bool:
+        """
+        Marca um ou mais e-mails como lidos com um único comando UID STORE.
+        
+        Args:
+            email_ids: UID ou sequência de UIDs dos e-mails a serem marcados
         
         Returns:
             bool: True se a operação foi bem-sucedida, False caso contrário
@@ -197,22 +889,31 @@ class IMAPEmailProvider(EmailProviderInterface):
             logger.error("Não conectado ao servidor IMAP")
             return False
         
+        message_set = _message_set(email_ids)
+        if not message_set:
+            return True
+        
         try:
-            # Adiciona a flag \Seen ao e-mail
-            self.mail.store(email_id, '+FLAGS', '\\Seen')
-            logger.info(f"E-mail {email_id} marcado como lido")
+            # Adiciona a flag \Seen aos e-mails
+            self.mail.uid('STORE', message_set, '+FLAGS', '\\Seen')
+            logger.info(f"E-mails {message_set} marcados como lidos")
             return True
         
         except imaplib.IMAP4.error as e:
-            logger.error(f"Erro ao marcar e-mail {email_id} como lido: {str(e)}")
+            logger.error(f"Erro ao marcar e-mails {message_set} como lidos: {str(e)}")
+            self._note_session_error(e)
             return False
     
-    def move_to_folder(self, email_id: str, folder: str) -> bool:
+    @_serialized
+    def move_to_folder(self, email_ids: Union[str, Sequence[str]], folder: str) -> bool:
         """
-        Move um e-mail para uma pasta específica.
+        Move um ou mais e-mails para uma pasta específica.
+        
+        Usa o comando MOVE (RFC 6851) quando o servidor o anuncia; caso
+        contrário, faz COPY + STORE e um único EXPUNGE para todo o lote.
         
         Args:
-            email_id: ID do e-mail a ser movido
+            email_ids: UID ou sequência de UIDs dos e-mails a serem movidos
             folder: Nome da pasta de destino
         
         Returns:
@@ -222,195 +923,491 @@ class IMAPEmailProvider(EmailProviderInterface):
             logger.error("Não conectado ao servidor IMAP")
             return False
         
+        message_set = _message_set(email_ids)
+        if not message_set:
+            return True
+        
         try:
-            # Copia o e-mail para a pasta de destino
-            result, data = self.mail.copy(email_id, folder)
+            if 'MOVE' in self.capabilities:
+                result, data = self.mail.uid('MOVE', message_set, folder)
+            else:
+                # Copia os e-mails para a pasta de destino
+                result, data = self.mail.uid('COPY', message_set, folder)
+                
+                if result == 'OK':
+                    # Marca os e-mails originais para exclusão e expurga uma única vez
+                    self.mail.uid('STORE', message_set, '+FLAGS', '\\Deleted')
+                    self.mail.expunge()
             
             if result == 'OK':
-                # Marca o e-mail original para exclusão
-                self.mail.store(email_id, '+FLAGS', '\\Deleted')
-                # Expurga os e-mails marcados para exclusão
-                self.mail.expunge()
-                logger.info(f"E-mail {email_id} movido para a pasta {folder}")
+                logger.info(f"E-mails {message_set} movidos para a pasta {folder}")
                 return True
             else:
-                logger.error(f"Erro ao copiar e-mail {email_id} para a pasta {folder}: {data}")
+                logger.error(f"Erro ao mover e-mails {message_set} para a pasta {folder}: {data}")
                 return False
         
         except imaplib.IMAP4.error as e:
-            logger.error(f"Erro ao mover e-mail {email_id} para a pasta {folder}: {str(e)}")
+            logger.error(f"Erro ao mover e-mails {message_set} para a pasta {folder}: {str(e)}")
+            self._note_session_error(e)
             return False
+
+class IMAPConnectionPool:
+    """
+    Mantém sessões IMAP persistentes por (servidor, usuário), evitando o custo
+    de TLS + LOGIN a cada operação.
+    """
+    
+    # Ociosidade (segundos) a partir da qual a sessão é verificada com NOOP antes do uso
+    IDLE_CHECK_SECONDS = 25 * 60
     
-    def _process_email(self, raw_email: bytes, email_id: str) -> Optional[Dict[str, Any]]:
+    def __init__(self):
+        """Inicializa o pool de conexões."""
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, config: Dict[str, Any]) -> Tuple[IMAPEmailProvider, Dict[str, Any]]:
         """
-        Processa um e-mail bruto e extrai metadados e conteúdo.
+        Reserva a sessão do pool para uso exclusivo, criando ou reconectando se
+        necessário. A reserva dura até release(); prefira lease().
         
         Args:
-            raw_email: E-mail bruto em bytes
-            email_id: ID do e-mail
+            config: Configuração do provedor
         
         Returns:
-            Optional[Dict[str, Any]]: Dicionário com metadados e conteúdo do e-mail, ou None em caso de erro
+            Tuple[IMAPEmailProvider, Dict[str, Any]]: Provedor com sessão persistente
+            e a entrada do pool a ser passada para release()
         """
+        key = (config.get('server', ''), config.get('username', ''))
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                provider = IMAPEmailProvider(
+                    server=config.get('server', ''),
+                    username=config.get('username', ''),
+                    password=config.get('password', ''),
+                    port=config.get('port', 993),
+                    use_ssl=config.get('use_ssl', True),
+                    keep_alive=True,
+                    incremental_sync=config.get('incremental_sync', False)
+                )
+                entry = {'provider': provider, 'last_used': 0.0, 'lock': threading.Lock()}
+                self._entries[key] = entry
+        
+        # Lock por conexão: uma sessão IMAP não pode ser usada por duas threads ao
+        # mesmo tempo, então ele permanece adquirido até release()
+        entry['lock'].acquire()
+        
         try:
-            # Analisa o e-mail
-            msg = email.message_from_bytes(raw_email)
+            provider = entry['provider']
+            
+            # Sessões ociosas por muito tempo podem ter sido encerradas pelo servidor
+            if provider.connected and time.monotonic() - entry['last_used'] > self.IDLE_CHECK_SECONDS:
+                try:
+                    provider.mail.noop()
+                except (imaplib.IMAP4.abort, OSError) as e:
+                    logger.warning(f"Sessão IMAP de {key[1]} perdida, reconectando: {str(e)}")
+                    provider.connected = False
             
-            # Extrai metadados
-            subject = self._decode_header(msg["Subject"])
-            from_addr = self._decode_header(msg["From"])
-            to_addr = self._decode_header(msg["To"])
-            date = self._decode_header(msg["Date"])
+            if not provider.connected:
+                provider.connect()
+        
+        except BaseException:
+            entry['lock'].release()
+            raise
+        
+        return provider, entry
+    
+    def release(self, entry: Dict[str, Any]) -> None:
+        """
+        Libera uma sessão reservada com acquire().
+        
+        Args:
+            entry: Entrada do pool retornada por acquire()
+        """
+        entry['last_used'] = time.monotonic()
+        entry['lock'].release()
+    
+    @contextlib.contextmanager
+    def lease(self, config: Dict[str, Any]):
+        """
+        Reserva a sessão do pool durante o bloco with.
+        
+        Args:
+            config: Configuração do provedor
+        
+        Yields:
+            IMAPEmailProvider: Provedor com sessão persistente, exclusivo do bloco
+        """
+        provider, entry = self.acquire(config)
+        
+        try:
+            yield provider
+        finally:
+            self.release(entry)
+    
+    def close_all(self) -> None:
+        """Encerra todas as sessões do pool."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        
+        for entry in entries:
+            with entry['lock']:
+                entry['provider'].close()
+
+# Pool compartilhado usado pela fábrica de provedores
+_connection_pool = IMAPConnectionPool()
+
+class PooledIMAPEmailProvider(EmailProviderInterface):
+    """
+    Provedor que usa uma sessão do pool de conexões. A sessão fica reservada
+    de connect() até disconnect(), de modo que outras threads com a mesma
+    configuração aguardam em vez de intercalar comandos na mesma conexão.
+    """
+    
+    def __init__(self, pool: IMAPConnectionPool, config: Dict[str, Any]):
+        """
+        Inicializa o provedor.
+        
+        Args:
+            pool: Pool de conexões
+            config: Configuração do provedor
+        """
+        self._pool = pool
+        self._config = config
+        self._provider = None
+        self._entry = None
+    
+    def connect(self) -> bool:
+        """
+        Reserva a sessão do pool.
+        
+        Returns:
+            bool: True se a sessão está conectada, False caso contrário
+        """
+        if self._entry is None:
+            self._provider, self._entry = self._pool.acquire(self._config)
+        
+        if not self._provider.connected:
+            self.disconnect()
+            return False
+        
+        return True
+    
+    def disconnect(self) -> bool:
+        """
+        Libera a sessão para o pool, sem encerrá-la.
+        
+        Returns:
+            bool: Sempre True
+        """
+        if self._entry is not None:
+            entry, self._entry = self._entry, None
+            self._pool.release(entry)
+        
+        return True
+    
+    def _session(self) -> IMAPEmailProvider:
+        """Retorna o provedor da sessão reservada."""
+        if self._entry is None:
+            raise RuntimeError("Sessão IMAP do pool não reservada; chame connect() antes")
+        return self._provider
+    
+    def _call(self, method_name: str, *args, **kwargs) -> Any:
+        """
+        Executa um método do provedor reservado. Se a sessão cair durante o
+        comando (IMAP4.abort), ela é descartada e o comando repetido uma vez em
+        uma nova conexão.
+        
+        Args:
+            method_name: Nome do método do provedor
             
-            # Extrai corpo e anexos
-            body, attachments = self._extract_content(msg)
+        Returns:
+            Any: Resultado do método
+        """
+        provider = self._session()
+        result = getattr(provider, method_name)(*args, **kwargs)
+        
+        if not provider.connected:
+            logger.warning(f"Sessão IMAP de {provider.username} perdida durante {method_name}, reconectando")
             
-            # Cria dicionário com informações do e-mail
-            email_data = {
-                "id": email_id.decode() if isinstance(email_id, bytes) else email_id,
-                "subject": subject,
-                "from": from_addr,
-                "to": to_addr,
-                "date": date,
-                "body": body,
-                "attachments": attachments
-            }
+            # Libera o socket da sessão perdida
+            try:
+                provider.mail.shutdown()
+            except (OSError, AttributeError):
+                pass
             
-            return email_data
+            if provider.connect():
+                result = getattr(provider, method_name)(*args, **kwargs)
         
-        except Exception as e:
-            logger.error(f"Erro ao processar e-mail: {str(e)}")
-            return None
+        return result
     
-    def _decode_header(self, header: Optional[str]) -> str:
+    def get_unread_emails(self, limit: int = 10, **kwargs) -> List[Dict[str, Any]]:
+        return self._call('get_unread_emails', limit=limit, **kwargs)
+    
+    def mark_as_read(self, email_ids: Union[str, Sequence[str]]) -> bool:
+        return self._call('mark_as_read', email_ids)
+    
+    def move_to_folder(self, email_ids: Union[str, Sequence[str]], folder: str) -> bool:
+        return self._call('move_to_folder', email_ids, folder)
+    
+    def count_unread(self) -> int:
+        return self._call('count_unread')
+
+class AsyncIMAPEmailProvider(_EmailMessageParser):
+    """
+    Provedor IMAP assíncrono (aioimaplib). Permite sincronizar várias caixas de
+    correio concorrentemente, sobrepondo as latências de rede.
+    """
+    
+    # Número máximo de mensagens por comando FETCH
+    FETCH_BATCH_SIZE = 100
+    
+    def __init__(self, server: str, username: str, password: str, port: int = 993, use_ssl: bool = True):
         """
-        Decodifica um cabeçalho de e-mail.
+        Inicializa o provedor IMAP assíncrono.
         
         Args:
-            header: Cabeçalho a ser decodificado
+            server: Endereço do servidor IMAP
+            username: Nome de usuário para autenticação
+            password: Senha para autenticação
+            port: Porta do servidor (padrão: 993 para SSL)
+            use_ssl: Se deve usar SSL para conexão
+        
+        Raises:
+            ImportError: Se aioimaplib não estiver instalado
+        """
+        if aioimaplib is None:
+            raise ImportError("aioimaplib é necessário para o provedor IMAP assíncrono")
+        
+        self.server = server
+        self.username = username
+        self.password = password
+        self.port = port
+        self.use_ssl = use_ssl
+        self.mail = None
+        self.connected = False
+        
+        # Validar parâmetros
+        if not server or not username or not password:
+            raise ValueError("Servidor, usuário e senha são obrigatórios")
+    
+    async def connect(self) -> bool:
+        """
+        Conecta ao servidor IMAP.
         
         Returns:
-            str: Cabeçalho decodificado
+            bool: True se a conexão foi bem-sucedida, False caso contrário
         """
-        if not header:
-            return ""
+        try:
+            if self.use_ssl:
+                self.mail = aioimaplib.IMAP4_SSL(host=self.server, port=self.port,
+                                                 ssl_context=ssl.create_default_context())
+            else:
+                self.mail = aioimaplib.IMAP4(host=self.server, port=self.port)
+            
+            await self.mail.wait_hello_from_server()
+            
+            # Login
+            response = await self.mail.login(self.username, self.password)
+            if response.result != 'OK':
+                logger.error(f"Erro ao autenticar no servidor IMAP: {response.lines}")
+                self.connected = False
+                return False
+            
+            self.connected = True
+            logger.info(f"Conectado com sucesso ao servidor IMAP: {self.server}")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Erro ao conectar ao servidor IMAP: {str(e)}")
+            self.connected = False
+            return False
+    
+    async def disconnect(self) -> bool:
+        """
+        Desconecta do servidor IMAP.
+        
+        Returns:
+            bool: True se a desconexão foi bem-sucedida, False caso contrário
+        """
+        if not self.connected or not self.mail:
+            return True
         
         try:
-            decoded_header = decode_header(header)
-            parts = []
-            
-            for part, encoding in decoded_header:
-                if isinstance(part, bytes):
-                    # Tenta decodificar com o encoding especificado, ou utf-8, ou latin-1 como fallback
-                    try:
-                        if encoding:
-                            parts.append(part.decode(encoding))
-                        else:
-                            parts.append(part.decode('utf-8'))
-                    except UnicodeDecodeError:
-                        try:
-                            parts.append(part.decode('latin-1'))
-                        except UnicodeDecodeError:
-                            parts.append(part.decode('utf-8', errors='replace'))
-                else:
-                    parts.append(part)
-            
-            return " ".join(parts)
+            await self.mail.logout()
+            self.connected = False
+            logger.info("Desconectado do servidor IMAP")
+            return True
         
         except Exception as e:
-            logger.error(f"Erro ao decodificar cabeçalho: {str(e)}")
-            return header
+            logger.error(f"Erro ao desconectar do servidor IMAP: {str(e)}")
+            return False
     
-    def _extract_content(self, msg: email.message.Message) -> Tuple[str, List[Dict[str, Any]]]:
+    async def get_unread_emails(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
-        Extrai o corpo e anexos de um e-mail.
+        Obtém e-mails não lidos da caixa de entrada.
         
         Args:
-            msg: Mensagem de e-mail
+            limit: Número máximo de e-mails a serem obtidos
         
         Returns:
-            Tuple[str, List[Dict[str, Any]]]: Corpo do e-mail e lista de anexos
+            List[Dict[str, Any]]: Lista de e-mails não lidos com metadados
         """
-        body = ""
-        attachments = []
+        if not self.connected or not self.mail:
+            logger.error("Não conectado ao servidor IMAP")
+            return []
         
-        # Se a mensagem é multipart
-        if msg.is_multipart():
-            # Itera sobre as partes
-            for part in msg.walk():
-                content_type = part.get_content_type()
-                content_disposition = str(part.get("Content-Disposition"))
+        emails = []
+        
+        try:
+            # Seleciona a caixa de entrada
+            response = await self.mail.select("INBOX")
+            if response.result != 'OK':
+                logger.error(f"Erro ao selecionar caixa de entrada: {response.lines}")
+                return []
+            
+            # Busca e-mails não lidos por UID, como o provedor síncrono (IDs intercambiáveis)
+            response = await self.mail.uid_search("UNSEEN")
+            if response.result != 'OK':
+                logger.error(f"Erro ao buscar e-mails não lidos: {response.lines}")
+                return []
+            
+            # Obtém UIDs dos e-mails
+            email_ids = sorted(response.lines[0].decode().split(), key=int)
+            
+            # Limita o número de e-mails
+            if limit > 0:
+                email_ids = email_ids[:limit]
+            
+            for start in range(0, len(email_ids), self.FETCH_BATCH_SIZE):
+                batch = email_ids[start:start + self.FETCH_BATCH_SIZE]
+                response = await self.mail.uid('fetch', ",".join(batch), "(UID RFC822)")
                 
-                # Pula partes vazias ou multipart
-                if part.get_payload(decode=True) is None:
+                if response.result != 'OK':
+                    logger.error(f"Erro ao buscar e-mails {batch[0]}..{batch[-1]}: {response.lines}")
                     continue
                 
-                # Verifica se é um anexo
-                if "attachment" in content_disposition or "inline" in content_disposition:
-                    # Extrai informações do anexo
-                    filename = part.get_filename()
-                    if not filename:
-                        # Gera um nome de arquivo se não houver
-                        ext = content_type.split('/')[-1]
-                        filename = f"attachment-{len(attachments)}.{ext}"
-                    
-                    # Salva o anexo em um arquivo temporário
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{filename}") as temp:
-                        temp.write(part.get_payload(decode=True))
-                        temp_path = temp.name
-                    
-                    # Adiciona informações do anexo à lista
-                    attachments.append({
-                        "filename": filename,
-                        "content_type": content_type,
-                        "size": os.path.getsize(temp_path),
-                        "path": temp_path
-                    })
-                
-                # Verifica se é texto
-                elif content_type == "text/plain" and "attachment" not in content_disposition:
-                    # Adiciona ao corpo do e-mail
-                    payload = part.get_payload(decode=True)
-                    charset = part.get_content_charset()
-                    
-                    if charset:
-                        try:
-                            body += payload.decode(charset)
-                        except UnicodeDecodeError:
-                            body += payload.decode('utf-8', errors='replace')
-                    else:
-                        body += payload.decode('utf-8', errors='replace')
-                
-                # Verifica se é HTML
-                elif content_type == "text/html" and "attachment" not in content_disposition and not body:
-                    # Adiciona ao corpo do e-mail se não houver texto plano
-                    payload = part.get_payload(decode=True)
-                    charset = part.get_content_charset()
-                    
-                    if charset:
-                        try:
-                            body += payload.decode(charset)
-                        except UnicodeDecodeError:
-                            body += payload.decode('utf-8', errors='replace')
-                    else:
-                        body += payload.decode('utf-8', errors='replace')
+                # O conteúdo de cada mensagem chega como bytearray, precedido
+                # pela linha b'<seq> FETCH (UID x RFC822 {n}'
+                lines = response.lines
+                for header, content in zip(lines, lines[1:]):
+                    if isinstance(content, bytearray):
+                        uid = _FETCH_UID_PATTERN.search(header)
+                        if not uid:
+                            continue
+                        email_id = uid.group(1).decode()
+                        # Análise e gravação de anexos rodam fora do loop de eventos
+                        email_data = await asyncio.to_thread(self._process_email_eagerly, bytes(content), email_id)
+                        if email_data:
+                            emails.append(email_data)
+            
+            logger.info(f"Obtidos {len(emails)} e-mails não lidos")
+            return emails
         
-        # Se a mensagem não é multipart
-        else:
-            # Extrai o corpo
-            content_type = msg.get_content_type()
-            payload = msg.get_payload(decode=True)
-            charset = msg.get_content_charset()
+        except Exception as e:
+            # Uma lista parcial seria indistinguível de uma caixa com menos e-mails
+            logger.error(f"Erro ao obter e-mails não lidos: {str(e)}")
+            return []
+    
+    def _process_email_eagerly(self, raw_email: bytes, email_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Analisa um e-mail e extrai todos os campos, inclusive corpo e anexos,
+        para que a árvore MIME e a gravação de anexos não rodem depois no loop
+        de eventos.
+        
+        Args:
+            raw_email: E-mail bruto em bytes
+            email_id: ID do e-mail
+        
+        Returns:
+            Optional[Dict[str, Any]]: Dicionário com metadados e conteúdo do e-mail, ou None em caso de erro
+        """
+        email_data = self._process_email(raw_email, email_id)
+        return email_data.to_dict() if email_data is not None else None
+    
+    async def mark_as_read(self, email_ids: Union[str, Sequence[str]]) -> bool:
+        """
+        Marca um ou mais e-mails como lidos com um único comando UID STORE.
+        
+        Args:
+            email_ids: UID ou sequência de UIDs dos e-mails a serem marcados
+        
+        Returns:
+            bool: True se a operação foi bem-sucedida, False caso contrário
+        """
+        if not self.connected or not self.mail:
+            logger.error("Não conectado ao servidor IMAP")
+            return False
+        
+        message_set = _message_set(email_ids)
+        if not message_set:
+            return True
+        
+        try:
+            response = await self.mail.uid('store', message_set, '+FLAGS', '\\Seen')
+            if response.result != 'OK':
+                logger.error(f"Erro ao marcar e-mails {message_set} como lidos: {response.lines}")
+                return False
             
-            if charset:
-                try:
-                    body = payload.decode(charset)
-                except UnicodeDecodeError:
-                    body = payload.decode('utf-8', errors='replace')
-            else:
-                body = payload.decode('utf-8', errors='replace')
+            logger.info(f"E-mails {message_set} marcados como lidos")
+            return True
         
-        return body, attachments
+        except Exception as e:
+            logger.error(f"Erro ao marcar e-mails {message_set} como lidos: {str(e)}")
+            return False
+    
+    async def move_to_folder(self, email_ids: Union[str, Sequence[str]], folder: str) -> bool:
+        """
+        Move um ou mais e-mails para uma pasta específica.
+        
+        Args:
+            email_ids: UID ou sequência de UIDs dos e-mails a serem movidos
+            folder: Nome da pasta de destino
+        
+        Returns:
+            bool: True se a operação foi bem-sucedida, False caso contrário
+        """
+        if not self.connected or not self.mail:
+            logger.error("Não conectado ao servidor IMAP")
+            return False
+        
+        message_set = _message_set(email_ids)
+        if not message_set:
+            return True
+        
+        try:
+            # Copia os e-mails para a pasta de destino
+            response = await self.mail.uid('copy', message_set, folder)
+            
+            if response.result != 'OK':
+                logger.error(f"Erro ao copiar e-mails {message_set} para a pasta {folder}: {response.lines}")
+                return False
+            
+            # Marca os e-mails originais para exclusão e expurga uma única vez
+            await self.mail.uid('store', message_set, '+FLAGS', '\\Deleted')
+            await self.mail.expunge()
+            logger.info(f"E-mails {message_set} movidos para a pasta {folder}")
+            return True
+        
+        except Exception as e:
+            logger.error(f"Erro ao mover e-mails {message_set} para a pasta {folder}: {str(e)}")
+            return False
+
+async def gather_unread_emails(providers: List[AsyncIMAPEmailProvider],
+                               limit: int = 10) -> List[List[Dict[str, Any]]]:
+    """
+    Obtém e-mails não lidos de várias caixas de correio concorrentemente.
+    
+    Args:
+        providers: Provedores assíncronos já conectados
+        limit: Número máximo de e-mails por caixa
+    
+    Returns:
+        List[List[Dict[str, Any]]]: E-mails não lidos de cada provedor, na mesma ordem
+    """
+    return await asyncio.gather(*[provider.get_unread_emails(limit=limit) for provider in providers])
 
 class EmailProviderFactory:
     """Fábrica para criar provedores de e-mail."""
@@ -422,7 +1419,9 @@ class EmailProviderFactory:
         
         Args:
             provider_type: Tipo de provedor ('imap', 'pop3', etc.)
-            config: Configuração do provedor
+            config: Configuração do provedor ('pooled': True reutiliza uma
+                sessão persistente do pool de conexões, reservada entre
+                connect() e disconnect())
         
         Returns:
             EmailProviderInterface: Instância do provedor de e-mail
@@ -431,12 +1430,16 @@ class EmailProviderFactory:
             ValueError: Se o tipo de provedor não for suportado
         """
         if provider_type.lower() == 'imap':
+            if config.get('pooled', False):
+                return PooledIMAPEmailProvider(_connection_pool, config)
+            
             return IMAPEmailProvider(
                 server=config.get('server', ''),
                 username=config.get('username', ''),
                 password=config.get('password', ''),
                 port=config.get('port', 993),
-                use_ssl=config.get('use_ssl', True)
+                use_ssl=config.get('use_ssl', True),
+                incremental_sync=config.get('incremental_sync', False)
             )
         else:
             raise ValueError(f"Tipo de provedor não suportado: {provider_type}")
@@ -468,9 +1471,9 @@ if __name__ == "__main__":
                 print(f"Data: {email_data['date']}")
                 print(f"Anexos: {len(email_data['attachments'])}")
                 print("-" * 50)
-                
-                # Marca como lido
-                provider.mark_as_read(email_data['id'])
+            
+            # Marca todos como lidos em um único comando
+            provider.mark_as_read([email_data['id'] for email_data in emails])
         
         finally:
             # Desconecta do servidor
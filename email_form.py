@@ -5,6 +5,17 @@ import json
 import gradio as gr
 from pathlib import Path
 import datetime
+from collections import ChainMap
+import itertools
+import asyncio
+import mimetypes
+
+# Usa orjson para a configuração quando disponível
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Configuração de logging
 logging.basicConfig(
@@ -13,11 +24,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger("email_form")
 
+# Opções padrão do formulário
+_DEFAULT_CATEGORIES = (
+    'novo_contrato',
+    'renovacao',
+    'alteracao',
+    'cancelamento',
+    'pagamento',
+    'duvida',
+    'reclamacao',
+    'suporte',
+    'outro'
+)
+_DEFAULT_PRIORITIES = (
+    'baixa',
+    'normal',
+    'alta',
+    'urgente'
+)
+_DEFAULT_DEPARTMENTS = (
+    'comercial',
+    'juridico',
+    'financeiro',
+    'atendimento',
+    'suporte_tecnico',
+    'triagem'
+)
+
+# Sequência de ids dos e-mails manuais (evita colisões no mesmo segundo)
+_ID_COUNTER = itertools.count()
+
+# Tipos de conteúdo para sufixos que o módulo mimetypes pode não conhecer
+_SUFFIX_CT = {
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/msword',
+    '.xls': 'application/vnd.ms-excel',
+    '.xlsx': 'application/vnd.ms-excel',
+    '.txt': 'text/plain',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+}
+
 class EmailForm:
     """
     Classe responsável pela interface de formulário para envio e processamento manual de e-mails.
     """
     
+    # Submissões processadas simultaneamente e tamanho máximo da fila do Gradio
+    QUEUE_CONCURRENCY = 8
+    QUEUE_MAX_SIZE = 64
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Inicializa o formulário de e-mail.
@@ -31,6 +89,16 @@ class EmailForm:
         # Configuração do formulário
         self.form_config = self.config.get('form', {})
         
+        # Opções dos campos de seleção
+        self._categories = tuple(self.form_config.get('categories', ()))
+        self._priorities = tuple(self.form_config.get('priorities', ()))
+        self._departments = tuple(self.form_config.get('departments', ()))
+        
+        # Valores iniciais (prioridade padrão: a segunda opção, normalmente 'normal')
+        self._default_category = self._categories[0] if self._categories else None
+        self._default_priority = self._priorities[1] if len(self._priorities) > 1 else (self._priorities[0] if self._priorities else None)
+        self._default_department = self._departments[0] if self._departments else None
+        
         # Inicializa interface
         self.interface = None
     
@@ -49,31 +117,9 @@ class EmailForm:
             'form': {
                 'title': 'Processamento Manual de E-mails',
                 'theme': 'default',
-                'categories': [
-                    'novo_contrato',
-                    'renovacao',
-                    'alteracao',
-                    'cancelamento',
-                    'pagamento',
-                    'duvida',
-                    'reclamacao',
-                    'suporte',
-                    'outro'
-                ],
-                'priorities': [
-                    'baixa',
-                    'normal',
-                    'alta',
-                    'urgente'
-                ],
-                'departments': [
-                    'comercial',
-                    'juridico',
-                    'financeiro',
-                    'atendimento',
-                    'suporte_tecnico',
-                    'triagem'
-                ]
+                'categories': _DEFAULT_CATEGORIES,
+                'priorities': _DEFAULT_PRIORITIES,
+                'departments': _DEFAULT_DEPARTMENTS
             }
         }
         
@@ -84,22 +130,16 @@ class EmailForm:
         
         try:
             # Carrega configuração do arquivo
-            with open(config_path, 'r') as file:
-                config = json.load(file)
+            config = _json_loads(Path(config_path).read_bytes())
             
             logger.info(f"Configuração carregada de {config_path}")
             
-            # Mescla com configuração padrão para garantir que todos os campos existam
-            for section, values in default_config.items():
-                if section not in config:
-                    config[section] = values
-                else:
-                    if isinstance(values, dict):
-                        for key, value in values.items():
-                            if key not in config[section]:
-                                config[section][key] = value
-            
-            return config
+            # Chaves ausentes caem nos valores padrão de cada seção, sem cópias
+            return {
+                **config,
+                **{section: ChainMap(config.get(section, {}), values)
+                   for section, values in default_config.items()}
+            }
         
         except Exception as e:
             logger.error(f"Erro ao carregar configuração de {config_path}: {str(e)}")
@@ -125,13 +165,15 @@ class EmailForm:
             Dict[str, Any]: Resultado do processamento
         """
         try:
+            now = datetime.datetime.now()
+            
             # Cria e-mail
             email = {
-                'id': f"manual_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}",
+                'id': f"manual_{now:%Y%m%d%H%M%S}_{next(_ID_COUNTER)}",
                 'from': from_email,
                 'subject': subject,
                 'body': body,
-                'date': datetime.datetime.now().isoformat(),
+                'date': now.isoformat(),
                 'ml_category': category,
                 'ml_category_confidence': 1.0,
                 'ml_priority': priority,
@@ -180,30 +222,10 @@ class EmailForm:
         Returns:
             str: Tipo de conteúdo
         """
-        import mimetypes
-        
         content_type, _ = mimetypes.guess_type(filename)
         
-        if not content_type:
-            # Tenta adivinhar pelo sufixo
-            suffix = os.path.splitext(filename)[1].lower()
-            
-            if suffix == '.pdf':
-                content_type = 'application/pdf'
-            elif suffix in ['.doc', '.docx']:
-                content_type = 'application/msword'
-            elif suffix in ['.xls', '.xlsx']:
-                content_type = 'application/vnd.ms-excel'
-            elif suffix == '.txt':
-                content_type = 'text/plain'
-            elif suffix in ['.jpg', '.jpeg']:
-                content_type = 'image/jpeg'
-            elif suffix == '.png':
-                content_type = 'image/png'
-            else:
-                content_type = 'application/octet-stream'
-        
-        return content_type
+        # Sem resultado do mimetypes, usa a tabela de sufixos
+        return content_type or _SUFFIX_CT.get(os.path.splitext(filename)[1].lower(), 'application/octet-stream')
     
     def launch(self, share: bool = False) -> None:
         """
@@ -218,11 +240,6 @@ class EmailForm:
         # Tema
         theme = self.form_config.get('theme', 'default')
         
-        # Opções de categoria, prioridade e departamento
-        categories = self.form_config.get('categories', [])
-        priorities = self.form_config.get('priorities', [])
-        departments = self.form_config.get('departments', [])
-        
         # Cria interface
         with gr.Blocks(title=title, theme=theme) as interface:
             gr.Markdown(f"# {title}")
@@ -235,20 +252,21 @@ class EmailForm:
                     attachments = gr.File(label="Anexos", file_count="multiple")
                 
                 with gr.Column():
-                    category = gr.Dropdown(label="Categoria", choices=categories, value=categories[0] if categories else None)
-                    priority = gr.Dropdown(label="Prioridade", choices=priorities, value=priorities[1] if len(priorities) > 1 else priorities[0] if priorities else None)
-                    department = gr.Dropdown(label="Departamento", choices=departments, value=departments[0] if departments else None)
+                    category = gr.Dropdown(label="Categoria", choices=self._categories, value=self._default_category)
+                    priority = gr.Dropdown(label="Prioridade", choices=self._priorities, value=self._default_priority)
+                    department = gr.Dropdown(label="Departamento", choices=self._departments, value=self._default_department)
                     
                     submit_button = gr.Button("Processar E-mail")
                     result = gr.Textbox(label="Resultado", interactive=False)
             
-            # Função de processamento
-            def process_func(from_email, subject, body, category, priority, department, attachments):
+            # Função de processamento (assíncrona: submissões simultâneas não se bloqueiam)
+            async def process_func(from_email, subject, body, category, priority, department, attachments):
                 # Obtém caminhos dos anexos
                 attachment_paths = [file.name for file in attachments] if attachments else []
                 
-                # Processa e-mail
-                result = self._process_email(
+                # Processa e-mail fora do loop de eventos (acesso a disco dos anexos)
+                result = await asyncio.to_thread(
+                    self._process_email,
                     from_email=from_email,
                     subject=subject,
                     body=body,
@@ -272,6 +290,7 @@ class EmailForm:
         self.interface = interface
         
         # Inicia interface
+        interface.queue(default_concurrency_limit=self.QUEUE_CONCURRENCY, max_size=self.QUEUE_MAX_SIZE)
         interface.launch(share=share)
 
 # Exemplo de uso
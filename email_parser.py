@@ -1,11 +1,19 @@
 import os
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Set, Callable
 import re
 import json
+import sys
+import functools
+import bisect
 import numpy as np
 from pathlib import Path
 
+try:
+    import ahocorasick
+except ImportError:  # dependência opcional; sem ela, as palavras-chave são contadas com str.count
+    ahocorasick = None
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -13,27 +21,119 @@ logging.basicConfig(
 )
 logger = logging.getLogger("email_parser")
 
+# Pontuação removida do final dos valores extraídos
+_TRAILING_PUNCT_RE = re.compile(r'[.,;:]$')
+
+# Remetente no formato "Nome <email>"
+_FROM_RE = re.compile(r'([^<]+)<([^>]+)>')
+
+def _compile_pattern(pattern: str, flags: int = 0) -> re.Pattern:
+    """
+    Compila um padrão que pode usar quantificadores possessivos ({m,n}+), que
+    impedem retrocesso. Antes do Python 3.11 o re não os suporta e eles são
+    convertidos em quantificadores comuns (mesmos resultados, sem a garantia).
+    
+    Args:
+        pattern: Expressão regular
+        flags: Flags do módulo re
+        
+    Returns:
+        re.Pattern: Padrão compilado
+    """
+    if sys.version_info < (3, 11):
+        pattern = pattern.replace('}+', '}')
+    return re.compile(pattern, flags)
+
+def _value_scanner(pattern: re.Pattern) -> Callable[[str], List[str]]:
+    """
+    Retorna a função que lista os valores capturados (primeiro grupo) por um padrão.
+    
+    Args:
+        pattern: Padrão compilado
+        
+    Returns:
+        Callable[[str], List[str]]: Função que recebe o texto e retorna os valores
+    """
+    # Um único grupo: findall já retorna as strings, sem criar objetos Match
+    if pattern.groups == 1:
+        return pattern.findall
+    
+    finditer = pattern.finditer
+    
+    def scan(text: str) -> List[str]:
+        return [match.group(1) for match in finditer(text)]
+    
+    return scan
+
+def _build_entity_extractor(patterns: Dict[str, List[re.Pattern]]) -> Callable[[str], Dict[str, List[str]]]:
+    """
+    Gera uma função de extração especializada para os padrões informados: os
+    pares (tipo, funções de varredura) e a limpeza de pontuação ficam resolvidos no
+    fechamento, sem consultas a dicionários ou atributos a cada chamada.
+    
+    Args:
+        patterns: Padrões compilados de cada tipo de entidade
+        
+    Returns:
+        Callable[[str], Dict[str, List[str]]]: Função que extrai as entidades de um texto
+    """
+    scanners = tuple(
+        (entity_type, tuple(_value_scanner(pattern) for pattern in entity_patterns))
+        for entity_type, entity_patterns in patterns.items()
+    )
+    strip_trailing_punct = functools.partial(_TRAILING_PUNCT_RE.sub, '')
+    
+    def extract(text: str) -> Dict[str, List[str]]:
+        entities = {}
+        
+        for entity_type, scans in scanners:
+            matches = []
+            seen = set()
+            
+            # Um padrão por vez: numa alternação única, a classe de letras e espaços
+            # de um padrão consumiria a palavra-chave do seguinte ("escola Maria
+            # colégio Santo Antonio") e a ordem dos valores mudaria
+            for scan in scans:
+                for value in scan(text):
+                    # Valor capturado, sem pontuação no final
+                    value = strip_trailing_punct(value.strip())
+                    
+                    # O conjunto evita buscas lineares na lista
+                    if value and value not in seen:
+                        seen.add(value)
+                        matches.append(value)
+            
+            if matches:
+                entities[entity_type] = matches
+        
+        return entities
+    
+    return extract
+
 class EmailParser:
     """
     Classe responsável por analisar e-mails e extrair informações estruturadas.
     """
     
+    # Categoria interna das palavras de urgência no autômato de palavras-chave
+    _URGENCY = '__urgency__'
+    
     def __init__(self):
         """Inicializa o parser de e-mails."""
         # Padrões para extração de informações
-        self.patterns = {
+        patterns = {
             'contract_number': [
-                r'contrato\s+n[º°]?\s*[:.]?\s*(\d{4,10}[-/]?[\dA-Z]{0,5})',
-                r'contrato\s+(\d{4,10}[-/]?[\dA-Z]{0,5})',
-                r'n[º°]?\s*[:.]?\s*(\d{4,10}[-/]?[\dA-Z]{0,5})',
-                r'processo\s+n[º°]?\s*[:.]?\s*(\d{4,10}[-/]?[\dA-Z]{0,5})'
+                r'\bcontrato\s+n[º°]?\s*[:.]?\s*(\d{4,10}+[-/]?[\dA-Z]{0,5}+)',
+                r'\bcontrato\s+(\d{4,10}+[-/]?[\dA-Z]{0,5}+)',
+                r'\bn[º°]?\s*[:.]?\s*(\d{4,10}+[-/]?[\dA-Z]{0,5}+)',
+                r'\bprocesso\s+n[º°]?\s*[:.]?\s*(\d{4,10}+[-/]?[\dA-Z]{0,5}+)'
             ],
             'school_name': [
-                r'escola\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',
-                r'colégio\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',
-                r'centro\s+educacional\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',
-                r'e\.e\.\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})',
-                r'e\.m\.\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50})'
+                r'escola\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50}+)',
+                r'colégio\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50}+)',
+                r'centro\s+educacional\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50}+)',
+                r'e\.e\.\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50}+)',
+                r'e\.m\.\s+([A-Za-zÀ-ÖØ-öø-ÿ\s]{3,50}+)'
             ],
             'date': [
                 r'(\d{2}/\d{2}/\d{4})',
@@ -58,6 +158,13 @@ class EmailParser:
             ]
         }
         
+        # Compila os padrões uma única vez
+        self.patterns = {
+            entity_type: [_compile_pattern(pattern, re.IGNORECASE) for pattern in entity_patterns]
+            for entity_type, entity_patterns in patterns.items()
+        }
+        self._entity_extractor = _build_entity_extractor(self.patterns)
+        
         # Palavras-chave para categorização
         self.keywords = {
             'novo_contrato': [
@@ -93,6 +200,80 @@ class EmailParser:
                 'como resolver', 'preciso de ajuda', 'não consigo'
             ]
         }
+        
+        # Fator de normalização dos scores (inverso do número de palavras-chave de cada categoria)
+        self._kw_inv_len = {category: 1.0 / len(keywords) for category, keywords in self.keywords.items() if keywords}
+        
+        # Palavras-chave de urgência
+        self.urgency_keywords = [
+            'urgente', 'emergência', 'imediato', 'crítico', 'prioritário',
+            'prazo curto', 'vencendo', 'expirar', 'hoje', 'amanhã'
+        ]
+        
+        # Autômato Aho-Corasick com todas as palavras-chave (categorias e
+        # urgência): uma única passada pelo texto encontra todas as ocorrências
+        self._keyword_automaton = self._build_keyword_automaton() if ahocorasick is not None else None
+    
+    def _build_keyword_automaton(self) -> Any:
+        """
+        Constrói o autômato de busca das palavras-chave de categorização.
+        
+        Returns:
+            Any: Autômato cujo valor associado a cada palavra-chave é o par
+                (palavra-chave, tupla de categorias); palavras de urgência levam
+                a categoria _URGENCY
+        """
+        keyword_categories = {}
+        for category, keywords in self.keywords.items():
+            for keyword in keywords:
+                keyword_categories.setdefault(keyword, []).append(category)
+        for keyword in self.urgency_keywords:
+            keyword_categories.setdefault(keyword, []).append(self._URGENCY)
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, categories in keyword_categories.items():
+            automaton.add_word(keyword, (keyword, tuple(categories)))
+        automaton.make_automaton()
+        
+        return automaton
+    
+    def _scan_keywords(self, normalized_text: str) -> Tuple[Dict[str, int], Set[str]]:
+        """
+        Conta as palavras-chave de cada categoria e identifica as palavras de
+        urgência presentes, em uma única passada quando o autômato está disponível.
+        
+        Args:
+            normalized_text: Texto completo do e-mail em minúsculas
+            
+        Returns:
+            Tuple[Dict[str, int], Set[str]]: Ocorrências por categoria e palavras de urgência
+                encontradas (sem o autômato, apenas 'urgente' quando ela estiver presente)
+        """
+        if self._keyword_automaton is None:
+            counts = {
+                category: sum(normalized_text.count(keyword) for keyword in keywords)
+                for category, keywords in self.keywords.items()
+            }
+            
+            # 'urgente' sozinha já define a prioridade: dispensa as demais buscas
+            if 'urgente' in normalized_text:
+                urgency_hits = {'urgente'}
+            else:
+                urgency_hits = {keyword for keyword in self.urgency_keywords if keyword in normalized_text}
+            
+            return counts, urgency_hits
+        
+        counts = dict.fromkeys(self.keywords, 0)
+        urgency_hits = set()
+        
+        for _, (keyword, categories) in self._keyword_automaton.iter(normalized_text):
+            for category in categories:
+                if category is self._URGENCY:
+                    urgency_hits.add(keyword)
+                else:
+                    counts[category] += 1
+        
+        return counts, urgency_hits
     
     def parse_email(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -104,31 +285,72 @@ class EmailParser:
         Returns:
             Dict[str, Any]: E-mail com informações estruturadas
         """
-        try:
-            # Cria cópia do e-mail para não modificar o original
-            parsed_email = email_data.copy()
+        return self._parse_email(email_data)
+    
+    def parse_emails(self, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analisa um lote de e-mails. Com o autômato de palavras-chave disponível,
+        os textos de todo o lote são percorridos em uma única passada.
+        
+        Args:
+            emails: Lista de dados de e-mails
+            
+        Returns:
+            List[Dict[str, Any]]: E-mails com informações estruturadas, na mesma ordem
+        """
+        if self._keyword_automaton is None or len(emails) < 2:
+            return [self._parse_email(email_data) for email_data in emails]
+        
+        texts = [self._extract_all_text(email_data) for email_data in emails]
+        scans = self._scan_keywords_batch([text.lower() for text in texts])
+        
+        return [
+            self._parse_email(email_data, all_text, keyword_scan)
+            for email_data, all_text, keyword_scan in zip(emails, texts, scans)
+        ]
+    
+    def _parse_email(self, email_data: Dict[str, Any], all_text: Optional[str] = None,
+                     keyword_scan: Optional[Tuple[Dict[str, int], Set[str]]] = None) -> Dict[str, Any]:
+        """
+        Analisa um e-mail, reaproveitando o texto e a contagem de palavras-chave
+        quando já calculados para o lote.
+        
+        Args:
+            email_data: Dados do e-mail
+            all_text: Texto completo do e-mail (calculado se None)
+            keyword_scan: Resultado de _scan_keywords para o texto (calculado se None)
             
+        Returns:
+            Dict[str, Any]: E-mail com informações estruturadas
+        """
+        try:
             # Extrai texto do e-mail (corpo e anexos)
-            all_text = self._extract_all_text(email_data)
+            if all_text is None:
+                all_text = self._extract_all_text(email_data)
             
             # Extrai entidades
             entities = self._extract_entities(all_text)
-            parsed_email['entities'] = entities
+            
+            # Conta palavras-chave de categoria e de urgência em uma única passada
+            if keyword_scan is None:
+                keyword_scan = self._scan_keywords(all_text.lower())
+            keyword_counts, urgency_hits = keyword_scan
             
             # Categoriza o e-mail
-            category, confidence = self._categorize_email(email_data, all_text)
-            parsed_email['category'] = category
-            parsed_email['category_confidence'] = confidence
+            category, confidence = self._categorize_email(email_data, keyword_counts)
             
             # Determina prioridade
-            priority = self._determine_priority(email_data, all_text, entities, category)
-            parsed_email['priority'] = priority
-            
-            # Extrai metadados adicionais
-            metadata = self._extract_metadata(email_data)
-            parsed_email['metadata'] = metadata
+            priority = self._determine_priority(email_data, urgency_hits, entities, category)
             
-            return parsed_email
+            # Monta o resultado de uma vez, sem modificar o original
+            return {
+                **email_data,
+                'entities': entities,
+                'category': category,
+                'category_confidence': confidence,
+                'priority': priority,
+                'metadata': self._extract_metadata(email_data)
+            }
         
         except Exception as e:
             logger.error(f"Erro ao analisar e-mail: {str(e)}")
@@ -151,27 +373,12 @@ class EmailParser:
         Returns:
             str: Todo o texto extraído
         """
-        texts = []
-        
-        # Adiciona assunto
-        subject = email_data.get('subject', '')
-        if subject:
-            texts.append(subject)
-        
-        # Adiciona corpo
-        body = email_data.get('body', '')
-        if body:
-            texts.append(body)
-        
-        # Adiciona texto de anexos processados
-        if 'processed_attachments' in email_data:
-            for attachment in email_data['processed_attachments']:
-                attachment_text = attachment.get('text', '')
-                if attachment_text:
-                    texts.append(attachment_text)
-        
-        # Combina todos os textos
-        return "\n\n".join(texts)
+        # Assunto, corpo e texto dos anexos processados, ignorando os vazios
+        attachment_texts = (attachment.get('text', '') for attachment in email_data.get('processed_attachments', ()))
+        
+        return "\n\n".join(
+            text for text in (email_data.get('subject', ''), email_data.get('body', ''), *attachment_texts) if text
+        )
     
     def _extract_entities(self, text: str) -> Dict[str, List[str]]:
         """
@@ -183,64 +390,60 @@ class EmailParser:
         Returns:
             Dict[str, List[str]]: Entidades extraídas
         """
-        entities = {}
+        return self._entity_extractor(text)
+    
+    def _scan_keywords_batch(self, normalized_texts: List[str]) -> List[Tuple[Dict[str, int], Set[str]]]:
+        """
+        Aplica o autômato de palavras-chave uma única vez sobre os textos de um
+        lote concatenados, atribuindo cada ocorrência ao texto de origem.
         
-        # Aplica cada padrão
-        for entity_type, patterns in self.patterns.items():
-            matches = []
-            
-            for pattern in patterns:
-                for match in re.finditer(pattern, text, re.IGNORECASE):
-                    # Extrai o grupo capturado
-                    value = match.group(1).strip()
-                    
-                    # Limpa o valor (remove pontuação no final, etc.)
-                    value = re.sub(r'[.,;:]$', '', value)
-                    
-                    # Adiciona à lista de matches
-                    if value and value not in matches:
-                        matches.append(value)
+        Args:
+            normalized_texts: Textos completos dos e-mails em minúsculas
             
-            if matches:
-                entities[entity_type] = matches
+        Returns:
+            List[Tuple[Dict[str, int], Set[str]]]: Resultado de _scan_keywords para cada texto
+        """
+        results = [(dict.fromkeys(self.keywords, 0), set()) for _ in normalized_texts]
         
-        return entities
+        # Posição inicial de cada texto no buffer concatenado (separador de 1 caractere)
+        starts = []
+        position = 0
+        for text in normalized_texts:
+            starts.append(position)
+            position += len(text) + 1
+        
+        # Nenhuma palavra-chave contém o separador, então nenhuma ocorrência atravessa dois textos
+        joined = '\x01'.join(normalized_texts)
+        
+        for end, (keyword, categories) in self._keyword_automaton.iter(joined):
+            counts, urgency_hits = results[bisect.bisect_right(starts, end) - 1]
+            for category in categories:
+                if category is self._URGENCY:
+                    urgency_hits.add(keyword)
+                else:
+                    counts[category] += 1
+        
+        return results
     
-    def _categorize_email(self, email_data: Dict[str, Any], text: str) -> Tuple[str, float]:
+    def _categorize_email(self, email_data: Dict[str, Any], counts: Dict[str, int]) -> Tuple[str, float]:
         """
         Categoriza um e-mail com base em seu conteúdo.
         
         Args:
             email_data: Dados do e-mail
-            text: Texto completo do e-mail
+            counts: Ocorrências de palavras-chave por categoria
             
         Returns:
             Tuple[str, float]: Categoria e confiança
         """
-        # Normaliza o texto (converte para minúsculas)
-        normalized_text = text.lower()
-        
-        # Conta ocorrências de palavras-chave para cada categoria
-        scores = {}
-        
-        for category, keywords in self.keywords.items():
-            score = 0
-            for keyword in keywords:
-                # Conta ocorrências da palavra-chave
-                count = normalized_text.count(keyword)
-                score += count
-            
-            # Normaliza o score pelo número de palavras-chave
-            if keywords:
-                scores[category] = score / len(keywords)
-            else:
-                scores[category] = 0
+        # Normaliza o score pelo número de palavras-chave
+        kw_inv_len = self._kw_inv_len
+        scores = {category: counts[category] * kw_inv_len.get(category, 0) for category in self.keywords}
         
         # Encontra a categoria com maior score
         if scores:
-            max_category = max(scores.items(), key=lambda x: x[1])
-            category = max_category[0]
-            confidence = max_category[1]
+            category = max(scores, key=scores.__getitem__)
+            confidence = scores[category]
             
             # Se a confiança for muito baixa, classifica como "outro"
             if confidence < 0.1:
@@ -250,29 +453,26 @@ class EmailParser:
         
         return "outro", 0.0
     
-    def _determine_priority(self, email_data: Dict[str, Any], text: str, 
+    def _determine_priority(self, email_data: Dict[str, Any], urgency_hits: Set[str], 
                            entities: Dict[str, List[str]], category: str) -> str:
         """
         Determina a prioridade de um e-mail.
         
         Args:
             email_data: Dados do e-mail
-            text: Texto completo do e-mail
+            urgency_hits: Palavras de urgência encontradas no texto
             entities: Entidades extraídas
             category: Categoria do e-mail
             
         Returns:
             str: Prioridade ('baixa', 'normal', 'alta', 'urgente')
         """
-        # Palavras-chave de urgência
-        urgency_keywords = [
-            'urgente', 'emergência', 'imediato', 'crítico', 'prioritário',
-            'prazo curto', 'vencendo', 'expirar', 'hoje', 'amanhã'
-        ]
+        # 'urgente' no texto define a prioridade independentemente da categoria
+        if 'urgente' in urgency_hits:
+            return 'urgente'
         
         # Verifica se há palavras de urgência no texto
-        normalized_text = text.lower()
-        urgency_count = sum(1 for keyword in urgency_keywords if keyword in normalized_text)
+        urgency_count = len(urgency_hits)
         
         # Categorias que geralmente têm prioridade mais alta
         high_priority_categories = ['cancelamento', 'reclamacao', 'pagamento']
@@ -284,7 +484,7 @@ class EmailParser:
             base_priority = 'normal'
         
         # Ajusta com base nas palavras de urgência
-        if urgency_count >= 3 or 'urgente' in normalized_text:
+        if urgency_count >= 3:
             return 'urgente'
         elif urgency_count >= 1 and base_priority == 'alta':
             return 'urgente'
@@ -311,7 +511,7 @@ class EmailParser:
         from_addr = email_data.get('from', '')
         if from_addr:
             # Tenta extrair nome e e-mail
-            match = re.search(r'([^<]+)<([^>]+)>', from_addr)
+            match = _FROM_RE.search(from_addr)
             if match:
                 metadata['sender_name'] = match.group(1).strip()
                 metadata['sender_email'] = match.group(2).strip()
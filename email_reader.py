@@ -1,8 +1,11 @@
 import os
+import re
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Iterator
 from email_analyzer.email_connector import EmailProviderInterface
-from email_analyzer.attachment_processor import AttachmentProcessor
+from email_analyzer.attachment_processor import AttachmentProcessor, PDFProcessor
 
 # Configuração de logging
 logging.basicConfig(
@@ -16,6 +19,15 @@ class EmailReader:
     Classe responsável por ler e-mails e extrair informações relevantes.
     """
     
+    # Número máximo de e-mails processados em paralelo (anexos, extração de informações)
+    MAX_WORKERS = 8
+    
+    # Palavras-chave de assunto relevantes, em uma única alternação (apenas palavras inteiras)
+    SUBJECT_KEYWORDS_RE = re.compile(r'\b(?:contrato|escola|educação|ensino|acordo|termo|aditivo)\b', re.IGNORECASE)
+    
+    # Pesos de relevância: números de contrato, nomes de escolas, datas e palavra-chave no assunto
+    RELEVANCE_WEIGHTS = np.array([0.4, 0.4, 0.1, 0.1])
+    
     def __init__(self, email_provider: EmailProviderInterface):
         """
         Inicializa o leitor de e-mails.
@@ -25,6 +37,7 @@ class EmailReader:
         """
         self.email_provider = email_provider
         self.attachment_processor = AttachmentProcessor()
+        self._pdf_processor = PDFProcessor()
     
     def read_emails(self, limit: int = 10, process_attachments: bool = True) -> List[Dict[str, Any]]:
         """
@@ -37,59 +50,114 @@ class EmailReader:
         Returns:
             List[Dict[str, Any]]: Lista de e-mails processados
         """
-        processed_emails = []
+        # A relevância do lote inteiro é calculada de uma vez no final
+        emails = list(self._iter_processed_emails(limit, process_attachments, score_relevance=False))
+        
+        if emails:
+            features = np.array([self._relevance_features(email) for email in emails], dtype=np.float64)
+            relevances = np.minimum(features @ self.RELEVANCE_WEIGHTS, 1.0)
+            
+            for email, relevance in zip(emails, relevances.tolist()):
+                email['relevance'] = relevance
+        
+        return emails
+    
+    def iter_emails(self, limit: int = 10, process_attachments: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Lê e-mails não lidos e entrega cada e-mail processado assim que fica
+        pronto, na ordem da caixa de entrada. Ao final (ou se o consumidor
+        interromper a iteração), os e-mails entregues são marcados como lidos
+        em um único comando e o provedor é desconectado.
+        
+        Args:
+            limit: Número máximo de e-mails a serem lidos
+            process_attachments: Se deve processar anexos
+            
+        Yields:
+            Dict[str, Any]: E-mail processado
+        """
+        return self._iter_processed_emails(limit, process_attachments, score_relevance=True)
+    
+    def _iter_processed_emails(self, limit: int, process_attachments: bool,
+                               score_relevance: bool) -> Iterator[Dict[str, Any]]:
+        """
+        Gerador usado por read_emails e iter_emails.
+        
+        Args:
+            limit: Número máximo de e-mails a serem lidos
+            process_attachments: Se deve processar anexos
+            score_relevance: Se a relevância deve ser calculada por e-mail
+            
+        Yields:
+            Dict[str, Any]: E-mail processado
+        """
+        delivered_ids = []
         
         try:
             # Conecta ao provedor de e-mail
             if not self.email_provider.connect():
                 logger.error("Falha ao conectar ao provedor de e-mail")
-                return []
+                return
             
             # Obtém e-mails não lidos
             emails = self.email_provider.get_unread_emails(limit=limit)
             
-            # Processa cada e-mail
-            for email_data in emails:
-                try:
-                    # Processa o e-mail
-                    processed_email = self._process_email(email_data, process_attachments)
-                    processed_emails.append(processed_email)
+            if not emails:
+                return
+            
+            # Processa os e-mails em paralelo, entregando os resultados na ordem original
+            executor = ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(emails)))
+            futures = [
+                executor.submit(self._process_email, email_data, process_attachments, score_relevance)
+                for email_data in emails
+            ]
+            
+            try:
+                for email_data, future in zip(emails, futures):
+                    try:
+                        processed_email = future.result()
                     
-                    # Marca o e-mail como lido
-                    self.email_provider.mark_as_read(email_data['id'])
-                
-                except Exception as e:
-                    logger.error(f"Erro ao processar e-mail {email_data.get('id', 'desconhecido')}: {str(e)}")
+                    except Exception as e:
+                        logger.error(f"Erro ao processar e-mail {email_data.get('id', 'desconhecido')}: {str(e)}")
+                        continue
+                    
+                    delivered_ids.append(processed_email['id'])
+                    yield processed_email
             
-            return processed_emails
+            finally:
+                # Descarta o processamento pendente se a iteração foi interrompida
+                executor.shutdown(wait=True, cancel_futures=True)
         
         except Exception as e:
             logger.error(f"Erro ao ler e-mails: {str(e)}")
-            return []
         
         finally:
+            # Marca os e-mails entregues como lidos em um único comando
+            if delivered_ids:
+                self.email_provider.mark_as_read(delivered_ids)
+            
             # Desconecta do provedor de e-mail
             self.email_provider.disconnect()
     
-    def _process_email(self, email_data: Dict[str, Any], process_attachments: bool) -> Dict[str, Any]:
+    def _process_email(self, email_data: Dict[str, Any], process_attachments: bool,
+                       score_relevance: bool = True) -> Dict[str, Any]:
         """
         Processa um e-mail e extrai informações relevantes.
         
         Args:
             email_data: Dados do e-mail
             process_attachments: Se deve processar anexos
+            score_relevance: Se deve calcular a relevância do e-mail
             
         Returns:
             Dict[str, Any]: E-mail processado com informações extraídas
         """
-        # Cria cópia do e-mail para não modificar o original
-        processed_email = email_data.copy()
-        
         # Extrai entidades do corpo do e-mail
         body = email_data.get('body', '')
+        extracted_info = self._extract_information(body)
         
-        # Adiciona informações extraídas
-        processed_email['extracted_info'] = self._extract_information(body)
+        # Novo dicionário com os campos originais e as informações extraídas (o original não é modificado)
+        processed_email = {**email_data, 'extracted_info': extracted_info}
         
         # Processa anexos se necessário
         if process_attachments and 'attachments' in email_data:
@@ -104,14 +172,15 @@ class EmailReader:
                     processed_attachment['extracted_info'] = attachment_info
                     
                     # Combina informações extraídas do anexo com as do e-mail
-                    self._combine_extracted_info(processed_email['extracted_info'], attachment_info)
+                    self._combine_extracted_info(extracted_info, attachment_info)
                 
                 processed_attachments.append(processed_attachment)
             
             processed_email['processed_attachments'] = processed_attachments
         
         # Determina a relevância do e-mail para contratos escolares
-        processed_email['relevance'] = self._determine_relevance(processed_email)
+        if score_relevance:
+            processed_email['relevance'] = self._determine_relevance(processed_email)
         
         return processed_email
     
@@ -126,8 +195,7 @@ class EmailReader:
             Dict[str, Any]: Informações extraídas
         """
         # Utiliza os métodos de extração do PDFProcessor
-        from email_analyzer.attachment_processor import PDFProcessor
-        pdf_processor = PDFProcessor()
+        pdf_processor = self._pdf_processor
         
         contract_numbers = pdf_processor._extract_contract_numbers(text)
         school_names = pdf_processor._extract_school_names(text)
@@ -152,8 +220,8 @@ class EmailReader:
         """
         for key, values in source.items():
             if key in target:
-                # Combina listas e remove duplicatas
-                target[key] = list(set(target[key] + values))
+                # Combina listas e remove duplicatas, preservando a ordem
+                target[key] = list(dict.fromkeys(target[key] + values))
             else:
                 target[key] = values
     
@@ -167,35 +235,44 @@ class EmailReader:
         Returns:
             float: Pontuação de relevância (0.0 a 1.0)
         """
+        has_contract, has_school, has_date, has_keyword = self._relevance_features(email)
         relevance = 0.0
-        extracted_info = email.get('extracted_info', {})
         
-        # Verifica se há números de contrato
-        contract_numbers = extracted_info.get('contract_numbers', [])
-        if contract_numbers:
+        if has_contract:
             relevance += 0.4
         
-        # Verifica se há nomes de escolas
-        school_names = extracted_info.get('school_names', [])
-        if school_names:
+        if has_school:
             relevance += 0.4
         
-        # Verifica se há datas
-        dates = extracted_info.get('dates', [])
-        if dates:
+        if has_date:
             relevance += 0.1
         
-        # Verifica palavras-chave no assunto
-        subject = email.get('subject', '').lower()
-        keywords = ['contrato', 'escola', 'educação', 'ensino', 'acordo', 'termo', 'aditivo']
-        
-        for keyword in keywords:
-            if keyword in subject:
-                relevance += 0.1
-                break
+        if has_keyword:
+            relevance += 0.1
         
         # Limita a relevância a 1.0
         return min(relevance, 1.0)
+    
+    def _relevance_features(self, email: Dict[str, Any]) -> Tuple[bool, bool, bool, bool]:
+        """
+        Indicadores usados no cálculo de relevância, na ordem de RELEVANCE_WEIGHTS.
+        
+        Args:
+            email: E-mail processado
+            
+        Returns:
+            Tuple[bool, bool, bool, bool]: Se há números de contrato, nomes de
+            escolas, datas e palavra-chave no assunto
+        """
+        extracted_info = email.get('extracted_info', {})
+        subject = email.get('subject', '')
+        
+        return (
+            bool(extracted_info.get('contract_numbers')),
+            bool(extracted_info.get('school_names')),
+            bool(extracted_info.get('dates')),
+            self.SUBJECT_KEYWORDS_RE.search(subject) is not None
+        )
 
 # Exemplo de uso
 if __name__ == "__main__":
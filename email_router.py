@@ -2,7 +2,9 @@ import os
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 import json
+import queue
 import smtplib
+import contextlib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
@@ -21,6 +23,9 @@ class EmailRouter:
     Classe responsável por encaminhar e-mails para os departamentos apropriados.
     """
     
+    # Número máximo de sessões SMTP ociosas mantidas no pool
+    SMTP_POOL_SIZE = 4
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Inicializa o roteador de e-mails.
@@ -36,6 +41,9 @@ class EmailRouter:
         
         # Configuração de SMTP
         self.smtp_config = self.config.get('smtp', {})
+        
+        # Sessões SMTP autenticadas reutilizadas entre envios, com o número de mensagens já enviadas por cada uma
+        self._smtp_pool = queue.Queue(maxsize=self.SMTP_POOL_SIZE)
     
     def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
         """
@@ -64,7 +72,8 @@ class EmailRouter:
                 'password': 'senha',
                 'use_tls': True,
                 'from_email': 'sistema@empresa.com',
-                'from_name': 'Sistema de Contratos'
+                'from_name': 'Sistema de Contratos',
+                'max_messages_per_connection': 100
             },
             'templates': {
                 'forward_subject': '[Encaminhamento] {original_subject}',
@@ -216,10 +225,8 @@ class EmailRouter:
         try:
             # Obtém configuração SMTP
             smtp_server = self.smtp_config.get('server', '')
-            smtp_port = self.smtp_config.get('port', 587)
             smtp_username = self.smtp_config.get('username', '')
             smtp_password = self.smtp_config.get('password', '')
-            use_tls = self.smtp_config.get('use_tls', True)
             from_email = self.smtp_config.get('from_email', '')
             from_name = self.smtp_config.get('from_name', 'Sistema de Contratos')
             
@@ -286,12 +293,7 @@ class EmailRouter:
                         msg.attach(part)
             
             # Envia e-mail
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                if use_tls:
-                    server.starttls()
-                
-                server.login(smtp_username, smtp_password)
-                
+            with self._get_smtp() as server:
                 # Define destinatários
                 recipients = [to_email]
                 
@@ -346,10 +348,8 @@ class EmailRouter:
             
             # Obtém configuração SMTP
             smtp_server = self.smtp_config.get('server', '')
-            smtp_port = self.smtp_config.get('port', 587)
             smtp_username = self.smtp_config.get('username', '')
             smtp_password = self.smtp_config.get('password', '')
-            use_tls = self.smtp_config.get('use_tls', True)
             from_email = self.smtp_config.get('from_email', '')
             from_name = self.smtp_config.get('from_name', 'Sistema de Contratos')
             
@@ -387,11 +387,7 @@ class EmailRouter:
             msg.attach(MIMEText(body, 'html'))
             
             # Envia e-mail
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                if use_tls:
-                    server.starttls()
-                
-                server.login(smtp_username, smtp_password)
+            with self._get_smtp() as server:
                 server.sendmail(from_email, [sender_email], msg.as_string())
             
             logger.info(f"Resposta automática enviada para {sender_email}")
@@ -400,6 +396,114 @@ class EmailRouter:
         except Exception as e:
             logger.error(f"Erro ao enviar resposta automática: {str(e)}")
             return False
+    
+    @contextlib.contextmanager
+    def _get_smtp(self):
+        """
+        Fornece uma sessão SMTP autenticada, reutilizando as do pool. Sessões
+        que não respondem ao NOOP são descartadas e substituídas; ao atingir
+        max_messages_per_connection, a sessão é encerrada em vez de devolvida.
+        
+        Yields:
+            smtplib.SMTP: Sessão pronta para envio
+        """
+        entry = None
+        
+        try:
+            entry = self._smtp_pool.get_nowait()
+        except queue.Empty:
+            pass
+        
+        # Verifica se a sessão reutilizada ainda está ativa (o servidor pode tê-la encerrado)
+        if entry is not None and not self._smtp_alive(entry[0]):
+            logger.info("Sessão SMTP inativa, reconectando")
+            self._close_smtp(entry[0])
+            entry = None
+        
+        if entry is None:
+            entry = [self._open_smtp(), 0]
+        
+        try:
+            yield entry[0]
+        except Exception:
+            # Estado da sessão desconhecido após a falha; não volta ao pool
+            self._close_smtp(entry[0])
+            raise
+        
+        entry[1] += 1
+        
+        if entry[1] >= self.smtp_config.get('max_messages_per_connection', 100):
+            self._close_smtp(entry[0])
+            return
+        
+        try:
+            self._smtp_pool.put_nowait(entry)
+        except queue.Full:
+            self._close_smtp(entry[0])
+    
+    def _open_smtp(self) -> smtplib.SMTP:
+        """
+        Abre uma nova sessão SMTP (conexão, STARTTLS e login).
+        
+        Returns:
+            smtplib.SMTP: Sessão autenticada
+        """
+        server = smtplib.SMTP(self.smtp_config.get('server', ''), self.smtp_config.get('port', 587))
+        
+        try:
+            if self.smtp_config.get('use_tls', True):
+                server.starttls()
+            
+            server.login(self.smtp_config.get('username', ''), self.smtp_config.get('password', ''))
+        except Exception:
+            self._close_smtp(server)
+            raise
+        
+        return server
+    
+    def _smtp_alive(self, server: smtplib.SMTP) -> bool:
+        """
+        Verifica com NOOP se uma sessão SMTP ainda está ativa.
+        
+        Args:
+            server: Sessão SMTP
+            
+        Returns:
+            bool: True se o servidor respondeu 250, False caso contrário
+        """
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    
+    def _close_smtp(self, server: smtplib.SMTP) -> None:
+        """
+        Encerra uma sessão SMTP, ignorando erros de conexão já perdida.
+        
+        Args:
+            server: Sessão SMTP
+        """
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+    
+    def close(self) -> None:
+        """Encerra todas as sessões SMTP do pool."""
+        while True:
+            try:
+                server, _ = self._smtp_pool.get_nowait()
+            except queue.Empty:
+                break
+            
+            self._close_smtp(server)
+    
+    def __del__(self):
+        """Encerra as sessões SMTP ao descartar o roteador."""
+        try:
+            self.close()
+        except Exception:
+            pass
 
 # Exemplo de uso
 if __name__ == "__main__":
@@ -33,12 +33,32 @@ class NotificationManager:
         # Histórico de notificações
         self.notification_history = []
         
+        # Indica que o arquivo precisa ser regravado por inteiro (ex.: formato legado)
+        self._history_needs_rewrite = False
+        
+        # Número de notificações gravadas no arquivo (pode exceder max_history até a compactação)
+        self._history_file_lines = 0
+        
         # Carrega histórico se existir
         history_path = self.notification_config.get('history_path', 'notification_history.json')
         if os.path.exists(history_path):
             try:
                 with open(history_path, 'r') as f:
-                    self.notification_history = json.load(f)
+                    content = f.read()
+                
+                if content.lstrip().startswith('['):
+                    # Formato legado (lista JSON): convertido para JSONL no próximo salvamento
+                    self.notification_history = json.loads(content)
+                    self._history_needs_rewrite = True
+                else:
+                    self.notification_history = [
+                        json.loads(line) for line in content.splitlines() if line.strip()
+                    ]
+                    self._history_file_lines = len(self.notification_history)
+                
+                # O arquivo pode conter até 2x max_history linhas entre compactações
+                max_history = self.notification_config.get('max_history', 1000)
+                del self.notification_history[:-max_history]
             except Exception as e:
                 logger.error(f"Erro ao carregar histórico de notificações: {str(e)}")
     
@@ -195,10 +215,15 @@ class NotificationManager:
             # Limita tamanho do histórico
             max_history = self.notification_config.get('max_history', 1000)
             if len(self.notification_history) > max_history:
-                self.notification_history = self.notification_history[-max_history:]
+                del self.notification_history[:-max_history]
             
-            # Salva histórico
-            self._save_history()
+            # Salva histórico: anexa apenas a nova linha. O arquivo só é compactado
+            # (regravado com as últimas max_history notificações) quando chega ao
+            # dobro do limite, evitando regravá-lo a cada notificação
+            if self._history_needs_rewrite or self._history_file_lines >= 2 * max_history:
+                self._save_history()
+            else:
+                self._append_history(notification)
             
             # Envia notificações
             success = True
@@ -226,17 +251,49 @@ class NotificationManager:
     
     def _save_history(self) -> bool:
         """
-        Salva histórico de notificações.
+        Regrava o histórico de notificações completo (uma notificação JSON por linha).
+        
+        O arquivo é substituído atomicamente, para que leitores incrementais
+        percebam a regravação pela troca de inode.
         
         Returns:
             bool: True se o histórico foi salvo com sucesso, False caso contrário
         """
+        try:
+            history_path = self.notification_config.get('history_path', 'notification_history.json')
+            temp_path = f"{history_path}.tmp"
+            
+            with open(temp_path, 'w') as f:
+                for notification in self.notification_history:
+                    f.write(json.dumps(notification) + '\n')
+            
+            os.replace(temp_path, history_path)
+            self._history_needs_rewrite = False
+            self._history_file_lines = len(self.notification_history)
+            
+            return True
+        
+        except Exception as e:
+            logger.error(f"Erro ao salvar histórico de notificações: {str(e)}")
+            return False
+    
+    def _append_history(self, notification: Dict[str, Any]) -> bool:
+        """
+        Anexa uma notificação ao final do arquivo de histórico.
+        
+        Args:
+            notification: Notificação a ser anexada
+            
+        Returns:
+            bool: True se a notificação foi salva com sucesso, False caso contrário
+        """
         try:
             history_path = self.notification_config.get('history_path', 'notification_history.json')
             
-            with open(history_path, 'w') as f:
-                json.dump(self.notification_history, f, indent=2)
+            with open(history_path, 'a') as f:
+                f.write(json.dumps(notification) + '\n')
             
+            self._history_file_lines += 1
             return True
         
         except Exception as e:
@@ -428,8 +485,8 @@ class NotificationManager:
             if level:
                 filtered = [n for n in filtered if n.get('level') == level]
             
-            # Ordena por data (mais recentes primeiro)
-            filtered.sort(key=lambda x: x.get('date', ''), reverse=True)
+            # Ordena por data (mais recentes primeiro), sem reordenar o histórico em memória
+            filtered = sorted(filtered, key=lambda x: x.get('date', ''), reverse=True)
             
             # Limita número de resultados
             return filtered[:limit]
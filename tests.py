@@ -10,7 +10,7 @@ from unittest.mock import patch, MagicMock
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Importa módulos do sistema
-from email_analyzer.email_connector import EmailConnector
+from email_analyzer.email_connector import EmailConnector, _EmailMessageParser
 from email_analyzer.email_reader import EmailReader
 from email_analyzer.email_parser import EmailParser
 from email_analyzer.attachment_processor import AttachmentProcessor
@@ -128,6 +128,93 @@ class TestEmailAnalyzer(unittest.TestCase):
         self.assertIn('R$ 5.000,00', result['values'])
         self.assertIn('31/12/2023', result['dates'])
     
+    def test_email_parser_entities_match_baseline(self):
+        """Testa se a extração de entidades mantém os valores e a ordem da versão original"""
+        parser = EmailParser()
+        
+        # Nomes de escolas sobrepostos: cada padrão encontra o seu
+        entities = parser._extract_entities(
+            "Escola Estadual Maria colégio Santo Antonio e centro educacional Alfa"
+        )
+        self.assertEqual(entities, {
+            'school_name': [
+                'Estadual Maria colégio Santo Antonio e centro educ',
+                'Santo Antonio e centro educacional Alfa',
+                'Alfa'
+            ]
+        })
+        
+        # Valores na ordem dos padrões, não na ordem do texto
+        entities = parser._extract_entities(
+            "Processo nº 998877 referente ao contrato nº 12345, assinado em 5 de março de 2023 "
+            "e vigente até 12/03/2024; contrato 55555/AB"
+        )
+        self.assertEqual(entities, {
+            'contract_number': ['12345', '55555/AB', '998877'],
+            'date': ['12/03/2024', '5 de março de 2023']
+        })
+    
+    def test_email_parser_keywords_match_baseline(self):
+        """Testa se a contagem de palavras-chave equivale às buscas por substring da versão original"""
+        parser = EmailParser()
+        
+        texts = [
+            "solicito a renovação do contrato e o aditivo do contrato da escola municipal",
+            "pedido de cancelamento: o pagamento da fatura vence amanhã, prazo curto",
+            "reclamação sobre atraso; assunto urgente, resolver hoje",
+            "mensagem sem relação com os temas monitorados"
+        ]
+        
+        for text in texts:
+            counts, urgency_hits = parser._scan_keywords(text)
+            
+            # Versão original: str.count de cada palavra-chave, somado por categoria
+            expected_counts = {
+                category: sum(text.count(keyword) for keyword in keywords)
+                for category, keywords in parser.keywords.items()
+            }
+            self.assertEqual(counts, expected_counts)
+            
+            # Versão original: 'urgente' basta; caso contrário, cada palavra de urgência presente
+            if 'urgente' in text:
+                self.assertIn('urgente', urgency_hits)
+            else:
+                self.assertEqual(
+                    urgency_hits,
+                    {keyword for keyword in parser.urgency_keywords if keyword in text}
+                )
+    
+    def test_lazy_email_mapping(self):
+        """Testa se o e-mail só extrai corpo e anexos quando acessados"""
+        raw_email = (
+            b"Subject: Contrato 12345\r\n"
+            b"From: escola@example.com\r\n"
+            b"To: test@example.com\r\n"
+            b"\r\n"
+            b"Conteudo de teste\r\n"
+        )
+        parser = _EmailMessageParser()
+        
+        with patch.object(parser, '_extract_content', wraps=parser._extract_content) as mock_extract:
+            lazy_email = parser._process_email(raw_email, '1')
+            
+            # Testes de pertinência não extraem o conteúdo
+            self.assertIn('attachments', lazy_email)
+            self.assertIn('body', lazy_email)
+            self.assertNotIn('ml_category', lazy_email)
+            mock_extract.assert_not_called()
+            
+            # dict() e to_dict() materializam os mesmos campos, extraindo o conteúdo uma vez
+            data = dict(lazy_email)
+            self.assertEqual(data, lazy_email.to_dict())
+            self.assertEqual(mock_extract.call_count, 1)
+        
+        self.assertEqual(data['id'], '1')
+        self.assertEqual(data['subject'], 'Contrato 12345')
+        self.assertEqual(data['from'], 'escola@example.com')
+        self.assertEqual(data['body'].strip(), 'Conteudo de teste')
+        self.assertEqual(data['attachments'], [])
+    
     def test_attachment_processor(self):
         """Testa processamento de anexos"""
         # Cria processador